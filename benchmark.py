@@ -0,0 +1,321 @@
+import argparse
+import ast
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from tokenizer_report import SAMPLE_FILES, read_sample
+
+ENGINE_MODULES = ['search_engine_1', 'search_engine_2', 'search_engine_3', 'search_engine_best']
+CORPUS_COLUMNS = ['tweet_id', 'tweet_date', 'full_text', 'urls', 'indices', 'retweet_text', 'retweet_urls',
+                  'retweet_indices', 'quoted_text', 'quote_urls', 'quoted_indices', 'retweet_quoted_text',
+                  'retweet_quoted_urls', 'retweet_quoted_indices']
+# the measured metrics, and whether a higher value is better
+METRICS = {'parse_docs_per_sec': True, 'parse_peak_memory_mb': False, 'build_sec': False, 'build_peak_memory_mb': False,
+           'load_index_sec': False, 'query_peak_memory_mb': False, 'query_p50_ms': False, 'query_p95_ms': False,
+           'query_p99_ms': False, 'bytes_per_posting': False, 'decode_postings_per_sec': True}
+
+
+def write_corpus_files(files, dest_dir):
+    """
+    writes the sample files in the layout of the corpus, so the engines index them as they index the corpus.
+    :param files: paths to sample parquet files
+    :param dest_dir: directory the files are written to
+    :return: list of paths to the written files, number of documents
+    """
+    corpus_files = []
+    number_of_documents = 0
+    for fn in files:
+        documents = read_sample(fn)
+        corpus_fn = os.path.join(dest_dir, os.path.basename(fn))
+        pd.DataFrame(documents, columns=CORPUS_COLUMNS).to_parquet(corpus_fn)
+        corpus_files.append(corpus_fn)
+        number_of_documents += len(documents)
+    return corpus_files, number_of_documents
+
+
+def traced_peak_mb(function, *args):
+    """
+    runs a function under tracemalloc.
+    :return: the result of the function, and the peak of the memory allocated while it ran in MB -
+    python objects and numpy arrays of this process, not the pages of the mapped index files
+    """
+    tracemalloc.start()
+    try:
+        result = function(*args)
+        return result, tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    finally:
+        tracemalloc.stop()
+
+
+def percentile_ms(timings, percentile):
+    return float(np.percentile(timings, percentile)) * 1000
+
+
+def engine_config(config_values):
+    """
+    :param config_values: dictionary of ConfigClass attributes set on the config of the engine
+    :return: the config of the engine, every query searched (no query cache)
+    """
+    from configuration import ConfigClass
+    config = ConfigClass()
+    for name, value in config_values.items():
+        setattr(config, name, value)
+    config.queryCacheBudget = None  # every query is searched
+    config.queryCacheWarmupFile = None
+    return config
+
+
+def benchmark_parse(engine_module, corpus_files, config_values, repeat):
+    """
+    measures parsing alone, the parser of the engine on the documents of all the files.
+    the memory is traced on a first pass, which is not timed.
+    :return: dictionary of the parse metrics
+    """
+    from parser_module import Parse
+    module = importlib.import_module(engine_module)
+    config = engine_config(config_values)
+
+    def parse_documents():
+        Parse.CAPITAL_LETTER_DICT, Parse.ENTITY_DICT, Parse.AMOUNT_OF_NUMBERS_IN_CORPUS = {}, {}, 0
+        engine = module.SearchEngine(config)
+        documents = [document for fn in corpus_files for document in engine._reader.read_file(fn)]
+        for document in documents:
+            engine._parser.parse_doc(document)
+        return documents
+
+    documents, parse_peak_memory_mb = traced_peak_mb(parse_documents)
+    parse_timings = []
+    for _ in range(repeat):
+        Parse.CAPITAL_LETTER_DICT, Parse.ENTITY_DICT, Parse.AMOUNT_OF_NUMBERS_IN_CORPUS = {}, {}, 0
+        parser = module.SearchEngine(config)._parser
+        start = time.perf_counter()
+        for document in documents:
+            parser.parse_doc(document)
+        parse_timings.append(time.perf_counter() - start)
+    return {'parse_docs_per_sec': len(documents) / min(parse_timings), 'parse_peak_memory_mb': parse_peak_memory_mb}
+
+
+def build_index(module, corpus_files, config_values):
+    """
+    indexes the files as build_index_from_corpus does, the index saved in the working directory.
+    """
+    engine = module.SearchEngine(engine_config(config_values))
+    for idx, fn in enumerate(corpus_files):
+        engine.last_parquet = idx == len(corpus_files) - 1
+        engine.build_index_from_parquet(fn)
+
+
+def benchmark_build(engine_module, corpus_files, config_values, work_dir):
+    """
+    measures the index build, and the compression of the postings of the saved index.
+    the memory is traced on a build of its own, in a directory of the work directory, which is not timed.
+    :return: dictionary of the build metrics
+    """
+    from disk_index import DiskIndex
+    module = importlib.import_module(engine_module)
+
+    traced_dir = os.path.join(work_dir, 'traced')
+    os.mkdir(traced_dir)
+    os.chdir(traced_dir)
+    _, build_peak_memory_mb = traced_peak_mb(build_index, module, corpus_files, config_values)
+    os.chdir(work_dir)
+    shutil.rmtree(traced_dir, ignore_errors=True)
+
+    start = time.perf_counter()
+    build_index(module, corpus_files, config_values)
+    build_sec = time.perf_counter() - start
+
+    compression = DiskIndex("inverted_idx.pkl").segments[0].compression_report()
+    return {'build_sec': build_sec, 'build_peak_memory_mb': build_peak_memory_mb,
+            'bytes_per_posting': compression['bytes_per_posting'],
+            'decode_postings_per_sec': compression['decode_postings_per_sec'],
+            'streaming_decode_postings_per_sec': compression['streaming_decode_postings_per_sec'],
+            'raw_decode_postings_per_sec': compression['raw_decode_postings_per_sec']}
+
+
+def benchmark_queries(engine_module, queries, config_values, work_dir, repeat):
+    """
+    measures loading the index built by benchmark_build, and searching it. the memory is traced on
+    a load and a pass over the queries of their own, which are not timed.
+    :return: dictionary of the load and query metrics
+    """
+    os.chdir(work_dir)
+    module = importlib.import_module(engine_module)
+    config = engine_config(config_values)
+
+    def load_and_search():
+        engine = module.SearchEngine(config)
+        engine.load_index("inverted_idx.pkl")
+        engine.load_precomputed_model()
+        for query in queries:
+            engine.search(query)
+
+    _, query_peak_memory_mb = traced_peak_mb(load_and_search)
+    load_timings = []
+    for _ in range(repeat):
+        engine = module.SearchEngine(config)
+        start = time.perf_counter()
+        engine.load_index("inverted_idx.pkl")
+        engine.load_precomputed_model()
+        load_timings.append(time.perf_counter() - start)
+
+    # the first pass loads what the searches load lazily (models, pages of the index), the next ones are timed
+    for query in queries:
+        engine.search(query)
+    query_timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            engine.search(query)
+            query_timings.append(time.perf_counter() - start)
+
+    return {'load_index_sec': min(load_timings), 'query_peak_memory_mb': query_peak_memory_mb,
+            'query_p50_ms': percentile_ms(query_timings, 50), 'query_p95_ms': percentile_ms(query_timings, 95),
+            'query_p99_ms': percentile_ms(query_timings, 99), 'query_mean_ms': float(np.mean(query_timings)) * 1000}
+
+
+def benchmark_engine(engine_module, corpus_files, queries, config_values, work_dir, repeat):
+    """
+    measures an engine. parsing, the index build and the searches are run each on a new process (the corpus
+    stats of the parser are class level), the peak memory of every phase traced on its own.
+    :param engine_module: name of the search engine module
+    :param corpus_files: paths to parquet files in the layout of the corpus
+    :param queries: list of queries
+    :param config_values: dictionary of ConfigClass attributes set on the config of the engine
+    :param work_dir: directory the index is saved in
+    :param repeat: number of times the documents are parsed and the index is loaded (the best time is taken),
+    and of timed passes over the queries
+    :return: dictionary of the metrics of the engine
+    """
+    metrics = {}
+    with multiprocessing.get_context('spawn').Pool(1, maxtasksperchild=1) as pool:
+        metrics.update(pool.apply(benchmark_parse, (engine_module, corpus_files, config_values, repeat)))
+        metrics.update(pool.apply(benchmark_build, (engine_module, corpus_files, config_values, work_dir)))
+        metrics.update(pool.apply(benchmark_queries, (engine_module, queries, config_values, work_dir, repeat)))
+    return metrics
+
+
+def run(engine_modules, files, queries_fn, config_values, repeat=5):
+    """
+    benchmarks every engine on the sample files.
+    :return: dictionary of the results - the setup of the run and the metrics of every engine
+    """
+    queries = list(pd.read_csv(queries_fn, sep='\t')['keywords'])
+    run_dir = tempfile.mkdtemp(prefix="benchmark_")
+    try:
+        corpus_files, number_of_documents = write_corpus_files(files, run_dir)
+        engines = {}
+        for engine_module in engine_modules:
+            work_dir = os.path.join(run_dir, engine_module)
+            os.mkdir(work_dir)
+            try:
+                engines[engine_module] = benchmark_engine(engine_module, corpus_files, queries, config_values,
+                                                          work_dir, repeat)
+                print(engine_module, format_metrics(engines[engine_module]))
+            except Exception as e:  # the other engines are still measured
+                engines[engine_module] = {'error': repr(e)}
+                print(engine_module, "failed:", repr(e))
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    return {'files': [os.path.basename(fn) for fn in files], 'documents': number_of_documents,
+            'queries': len(queries), 'repeat': repeat, 'config': config_values, 'python': platform.python_version(),
+            'platform': platform.platform(), 'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'engines': engines}
+
+
+def format_metrics(metrics):
+    return ', '.join('{} {}'.format(name, 'n/a' if metrics.get(name) is None else '%.2f' % metrics[name])
+                     for name in METRICS)
+
+
+def compare(results, baseline, tolerance):
+    """
+    compares the metrics of the engines to the ones of a baseline run.
+    :param results: dictionary of the results, as returned by run
+    :param baseline: dictionary of the results of the baseline run
+    :param tolerance: relative change of a metric for the worse (0.2 - 20%) flagged as a regression
+    :return: list of the regressions (engine, metric, baseline value, value, relative change)
+    """
+    if (baseline['files'], baseline['queries'], baseline['config']) != \
+            (results['files'], results['queries'], results['config']):
+        print("the baseline was run on other files, queries or config, the comparison may not hold")
+
+    regressions = []
+    for engine_module, metrics in results['engines'].items():
+        baseline_metrics = baseline['engines'].get(engine_module)
+        if baseline_metrics is None:
+            continue
+        for name, higher_is_better in METRICS.items():
+            value, baseline_value = metrics.get(name), baseline_metrics.get(name)
+            if not value or not baseline_value:
+                continue
+            change = (value - baseline_value) / baseline_value
+            regressed = -change > tolerance if higher_is_better else change > tolerance
+            print("%-20s %-20s %12.2f %12.2f %+8.1f%%%s" % (engine_module, name, baseline_value, value, change * 100,
+                                                          "  REGRESSION" if regressed else ""))
+            if regressed:
+                regressions.append((engine_module, name, baseline_value, value, change))
+    return regressions
+
+
+def parse_config_values(assignments):
+    """
+    :param assignments: list of 'name=value' strings, value as a python literal (strings may be left unquoted)
+    :return: dictionary of the ConfigClass attributes to set
+    """
+    config_values = {}
+    for assignment in assignments:
+        name, _, value = assignment.partition('=')
+        try:
+            config_values[name] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            config_values[name] = value
+    return config_values
+
+
+def main():
+    arguments = argparse.ArgumentParser(description='benchmark of parsing, indexing, loading and searching')
+    arguments.add_argument('--engines', nargs='+', default=ENGINE_MODULES, help='search engine modules')
+    arguments.add_argument('--files', nargs='+', default=SAMPLE_FILES, help='sample parquet files indexed')
+    arguments.add_argument('--queries', default=os.path.join('data', 'queries_train.tsv'),
+                           help="tsv file with a 'keywords' column")
+    arguments.add_argument('--set', nargs='*', default=[], metavar='NAME=VALUE',
+                           help='ConfigClass attributes set for the run, e.g. tokenizer=regex')
+    arguments.add_argument('--repeat', type=int, default=5,
+                           help='number of times the documents are parsed, the index is loaded and the queries are run')
+    arguments.add_argument('--output', default='benchmark.json', help='file the results are written to')
+    arguments.add_argument('--baseline', default='benchmark_baseline.json', help='results compared against')
+    arguments.add_argument('--save-baseline', action='store_true', help='write the results as the baseline')
+    arguments.add_argument('--tolerance', type=float, default=0.2,
+                           help='relative change for the worse flagged as a regression')
+    arguments = arguments.parse_args()
+
+    results = run(arguments.engines, arguments.files, arguments.queries, parse_config_values(arguments.set),
+                  arguments.repeat)
+    with open(arguments.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print("results written to", arguments.output)
+
+    if arguments.save_baseline:
+        shutil.copyfile(arguments.output, arguments.baseline)
+        print("baseline written to", arguments.baseline)
+    elif os.path.exists(arguments.baseline):
+        with open(arguments.baseline) as f:
+            regressions = compare(results, json.load(f), arguments.tolerance)
+        if regressions:
+            print("%d regressions against %s" % (len(regressions), arguments.baseline))
+            sys.exit(1)
+        print("no regressions against", arguments.baseline)
+
+
+if __name__ == '__main__':
+    main()
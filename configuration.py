@@ -15,6 +15,52 @@ class ConfigClass:
         self.saveFilesWithStem = self.savedFileMainFolder + "/WithStem"
         self.saveFilesWithoutStem = self.savedFileMainFolder + "/WithoutStem"
         self.toStem = True
+        # tokenizer of the parser - "nltk" (nltk's word_tokenize) or "regex" (a single precompiled regex,
+        # emitting the tokens of nltk's Treebank tokenizer at several times its speed)
+        self.tokenizer = "nltk"
+        # number of stems and normalized tokens memoized by the parser (None - no cache)
+        self.termCacheSize = 100000
+        # memory budget in MB for the postings held in memory while indexing. when it is exceeded the
+        # postings are flushed to disk in sorted blocks which are merged once indexing is done.
+        # None keeps the whole index in memory.
+        self.indexMemoryBudget = None
+        # read the parquet files in record batches of this many tweets, only the columns used by the parser,
+        # streaming the documents to the parser. None reads whole files with pandas.
+        self.readerBatchSize = None
+        # number of processes parsing the documents while indexing, and the amount of documents
+        # sent to a process at once. 1 parses on the main process.
+        self.parserProcesses = 1
+        self.parserBatchSize = 500
+        # number of url columns and urls memoized by the url extraction stage, which json decodes the urls
+        # of a batch of documents at once ahead of the parser (None - the parser extracts the urls of
+        # every document on its own)
+        self.urlCacheSize = 100000
+        # keep the positions of the terms in the documents, for the phrase ("herd immunity") and
+        # proximity ("herd immunity"~5) queries. without them the words of a phrase are searched as any other words
+        self.positionalIndex = True
+        # store the posting lists delta and variable-byte encoded
+        self.compressPostings = True
+        # memory budget in MB of the query results cache (None - no cache), and a query log
+        # (tsv with a 'keywords' column) to run when an index is loaded, to warm the cache
+        self.queryCacheBudget = 64
+        self.queryCacheWarmupFile = None
+        # number of processes ranking the queries of search_many, and the amount of queries
+        # sent to a process at once. 1 ranks on the main process.
+        self.searchProcesses = 1
+        self.searchChunkSize = 16
+        # smaller batches of search_many are ranked on the main process, sending them to the processes
+        # costs more than ranking them
+        self.searchMinQueries = 64
+        # trace the searches - the wall time of every stage (parse_query, query_expansion, posting_lookup...)
+        # and the amount of candidate docs and postings scanned, and the number of the slowest searches
+        # profiled with cProfile (0 - no cProfile, every search is profiled when set)
+        self.queryProfiling = False
+        self.profileSlowestQueries = 0
+        # local query server (query_server.py) - the port it listens on (localhost only), and the number of
+        # threads searching the queries. with serverProcesses the searches run on processes loading the index each.
+        self.serverPort = 8080
+        self.serverWorkers = 4
+        self.serverProcesses = False
 
         print('Project was created successfully..')
 
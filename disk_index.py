@@ -0,0 +1,541 @@
+import bisect
+import heapq
+import math
+import mmap
+import os
+import time
+import numpy as np
+import utils
+import vbyte
+from posting_list import PostingList, CompressedPostingList, ChainedPostingList, term_weights
+
+# one record per term, sorted by the utf-8 bytes of the term
+LEXICON_DTYPE = np.dtype([('term_offset', '<u8'), ('term_length', '<u4'), ('df', '<u4'), ('postings_offset', '<u8'),
+                          ('doc_ids_length', '<u4'), ('tfs_length', '<u4'), ('idf', '<f8'),
+                          ('positions_offset', '<u8'), ('position_counts_length', '<u4'), ('positions_length', '<u4')])
+# one record per document, indexed by doc id. the date is in seconds since the epoch (UTC)
+DOCS_DTYPE = np.dtype([('doc_length', '<i4'), ('date', '<i8'), ('max_freq_term', '<i4'), ('norm', '<f8')])
+
+FORMAT_VERSION = 9
+# suffixes of the files of a segment, see IndexWriter (and Indexer.save_spell for the spelling index)
+SEGMENT_FILES = ('.terms', '.lexicon.npy', '.postings', '.positions', '.docs.npy', '.ids.npy', '.spell')
+RAW_POSTING_SIZE = 10  # int32 doc id, float32 normalized tf, uint16 tf
+
+
+def inverse_document_frequency(number_of_documents, df):
+    """
+    :param number_of_documents: amount of documents in the index
+    :param df: document frequency of the term
+    :return: idf of the term
+    """
+    return math.log(number_of_documents / df, 10)
+
+
+def map_file(path):
+    """
+    maps a file into memory as read only, so the pages are loaded only when accessed and shared
+    between all the processes reading the same index.
+    :param path: file path
+    :return: mmap object (or empty bytes for an empty file)
+    """
+    with open(path, 'rb') as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return b''
+
+
+def segment_name(fn, generation):
+    """
+    the files of a segment are never written over, every save writes its segment under the generation it saves.
+    :param fn: file name of the index
+    :param generation: generation of the index the segment is saved in
+    :return: name of the segment
+    """
+    return '{}.g{}'.format(fn, generation)
+
+
+def write_manifest(path, segments, aliases, generation, retired=()):
+    """
+    the manifest is the file the index is saved as. it lists the segments of the index.
+    it replaces the previous manifest in one step, a reader opens either of them whole.
+    :param path: index file path
+    :param segments: list of segment info dictionaries, as returned by IndexWriter.close
+    :param aliases: terms of older segments that are folded into another term (None - removed)
+    :param generation: counter of the changes made to the index
+    :param retired: names of the segments of the previous manifest that this one does not list.
+    they are removed once the next manifest replaces this one, the readers of the previous manifest
+    keep reading them meanwhile
+    :return: -
+    """
+    utils.replace_obj({'format': FORMAT_VERSION, 'segments': segments, 'aliases': aliases, 'generation': generation,
+                       'retired': list(retired)}, path)
+
+
+def remove_segments(index_dir, names):
+    """
+    :param index_dir: directory of the index
+    :param names: names of the segments whose files are removed
+    :return: -
+    """
+    for name in names:
+        for suffix in SEGMENT_FILES:
+            try:
+                os.remove(os.path.join(index_dir, name + suffix))
+            except OSError:  # removed already, or still mapped by a reader (windows)
+                pass
+
+
+def saved_manifest(path):
+    """
+    :param path: index file path
+    :return: the manifest of the index saved at the path, None when there is none (or it is of an older format)
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        manifest = utils.load_obj(path)
+    except Exception:
+        return None
+    if not isinstance(manifest, dict) or manifest.get('format') != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+class IndexWriter:
+    """
+    Writes a segment of an index in the binary format read by Segment. For a segment saved as path the files are:
+    path.terms - the terms, path.lexicon.npy - term dictionary, path.postings - posting lists,
+    path.docs.npy - documents table, path.ids.npy - doc id to tweet id, path.positions - the positions of the terms
+    in the documents, for a positional index.
+    Posting lists can be added in any order, only the term dictionary is kept in memory.
+    When compress is set the doc ids are delta encoded and both doc ids and tfs are variable-byte
+    encoded; the normalized tfs are not stored since they are tf / max_freq_term of the document.
+    The idf of every term is stored in the lexicon, the tf-idf weights of the postings are computed from it
+    and the normalized tfs when a list is read. The documents table holds the norm of every document vector.
+    When positional is set the positions of every posting list are written as the amount of positions of every
+    posting followed by the positions, delta encoded within every posting, both variable-byte encoded.
+    """
+
+    def __init__(self, path, compress=True, positional=False):
+        self.path = path
+        self.compress = compress
+        self.positional = positional
+        self._postings = open(path + '.postings', 'wb')
+        self._positions = open(path + '.positions', 'wb')
+        self._entries = []
+        self.number_of_postings = 0
+        self.number_of_documents = 0
+
+    def add_posting_list(self, term, posting_list, idf):
+        """
+        writes a posting list sorted by doc id. a compressed list is written as [doc id gaps | tfs],
+        otherwise as [doc ids (int32) | normalized tfs (float32) | tfs (uint16)], padded to 4 bytes.
+        :param term: the term
+        :param posting_list: PostingList of the term
+        :param idf: idf of the term
+        :return: -
+        """
+        offset = self._postings.tell()
+        df = len(posting_list)
+        order = np.argsort(np.asarray(posting_list.doc_ids), kind='stable')
+        doc_ids = np.asarray(posting_list.doc_ids, dtype=np.int32)[order]
+        tfs = np.asarray(posting_list.tfs, dtype=np.uint16)[order]
+
+        if self.compress:
+            doc_ids_bytes = vbyte.encode_gaps(doc_ids)
+            tfs_bytes = vbyte.encode(tfs)
+            self._postings.write(doc_ids_bytes)
+            self._postings.write(tfs_bytes)
+            doc_ids_length, tfs_length = len(doc_ids_bytes), len(tfs_bytes)
+        else:
+            normalized_tfs = np.asarray(posting_list.normalized_tfs, dtype=np.float32)[order]
+            self._postings.write(doc_ids.tobytes())
+            self._postings.write(normalized_tfs.tobytes())
+            self._postings.write(tfs.tobytes())
+            if df % 2:
+                self._postings.write(b'\0\0')
+            doc_ids_length, tfs_length = 4 * df, 2 * df
+
+        positions_offset = self._positions.tell()
+        position_counts_length, positions_length = 0, 0
+        if self.positional:
+            position_counts_bytes, positions_bytes = self.encode_positions(posting_list, order)
+            self._positions.write(position_counts_bytes)
+            self._positions.write(positions_bytes)
+            position_counts_length, positions_length = len(position_counts_bytes), len(positions_bytes)
+
+        self._entries.append((term.encode('utf-8'), df, offset, doc_ids_length, tfs_length, idf,
+                              positions_offset, position_counts_length, positions_length))
+        self.number_of_postings += df
+
+    @staticmethod
+    def encode_positions(posting_list, order):
+        """
+        :param posting_list: PostingList of the term, holding its positions
+        :param order: the order the postings are written in
+        :return: the encoded amounts of positions of the postings, and the encoded positions
+        """
+        counts = np.asarray(posting_list.position_counts, dtype=np.int64)
+        positions = np.asarray(posting_list.positions, dtype=np.int64)
+        starts = np.cumsum(counts) - counts
+        counts = counts[order]
+        # the positions of every posting, the postings in the order they are written
+        ordered_starts = np.cumsum(counts) - counts
+        positions = positions[np.repeat(starts[order] - ordered_starts, counts) + np.arange(len(positions))]
+        return vbyte.encode(counts), vbyte.encode_position_gaps(positions, counts)
+
+    def write_documents(self, docs_dict, doc_ids):
+        """
+        :param docs_dict: dictionary mapping doc id to [doc length, date, max_freq_term, norm]
+        :param doc_ids: list mapping doc id to tweet id
+        :return: -
+        """
+        docs = np.zeros(len(doc_ids), dtype=DOCS_DTYPE)
+        for doc_id, (doc_length, date, max_freq_term, norm) in docs_dict.items():
+            docs[doc_id] = (doc_length, date, max_freq_term, norm)
+        np.save(self.path + '.docs.npy', docs)
+        np.save(self.path + '.ids.npy', np.array(doc_ids, dtype=np.bytes_))
+        self.number_of_documents = len(doc_ids)
+
+    def close(self):
+        """
+        sorts the term dictionary and writes it.
+        :return: segment info dictionary, to be listed in the manifest
+        """
+        self._postings.close()
+        self._positions.close()
+        self._entries.sort()
+
+        lexicon = np.zeros(len(self._entries), dtype=LEXICON_DTYPE)
+        term_offset = 0
+        with open(self.path + '.terms', 'wb') as f:
+            for i, (term, df, postings_offset, doc_ids_length, tfs_length, idf, *positions) in \
+                    enumerate(self._entries):
+                f.write(term)
+                lexicon[i] = (term_offset, len(term), df, postings_offset, doc_ids_length, tfs_length, idf,
+                              *positions)
+                term_offset += len(term)
+        np.save(self.path + '.lexicon.npy', lexicon)
+
+        return {'name': os.path.basename(self.path), 'compressed': self.compress, 'positional': self.positional,
+                'terms': len(self._entries), 'postings': self.number_of_postings,
+                'documents': self.number_of_documents}
+
+
+class TermDictionary:
+    """
+    Read only mapping of term to document frequency over the memory mapped lexicon.
+    Terms are found by a binary search, so nothing is loaded up front.
+    """
+
+    def __init__(self, lexicon, terms):
+        self._lexicon = lexicon
+        self._terms = terms
+        self._term_offsets = lexicon['term_offset']
+        self._term_lengths = lexicon['term_length']
+        self._dfs = lexicon['df']
+
+    def _term_at(self, row):
+        offset = int(self._term_offsets[row])
+        return self._terms[offset:offset + int(self._term_lengths[row])]
+
+    def find(self, term):
+        """
+        :param term: the term to look for
+        :return: the row of the term in the lexicon, -1 if it is not in the index
+        """
+        key = term.encode('utf-8')
+        low, high = 0, len(self._lexicon)
+        while low < high:
+            middle = (low + high) // 2
+            if self._term_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._lexicon) and self._term_at(low) == key:
+            return low
+        return -1
+
+    def __contains__(self, term):
+        return self.find(term) != -1
+
+    def __getitem__(self, term):
+        row = self.find(term)
+        if row == -1:
+            raise KeyError(term)
+        return int(self._dfs[row])
+
+    def get(self, term, default=None):
+        row = self.find(term)
+        return default if row == -1 else int(self._dfs[row])
+
+    def __len__(self):
+        return len(self._lexicon)
+
+    def __iter__(self):
+        for row in range(len(self._lexicon)):
+            yield self._term_at(row).decode('utf-8')
+
+    def keys(self):
+        return iter(self)
+
+
+class SegmentedTermDictionary:
+    """
+    Read only mapping of term to document frequency over all the segments of an index.
+    Aliased terms are hidden, and their frequency is added to the term they are folded into.
+    """
+
+    def __init__(self, segments, aliases):
+        self._segments = segments
+        self._aliases = aliases
+        self.folded_terms = {}
+        for term, target in aliases.items():
+            if target is not None:
+                if target not in self.folded_terms:
+                    self.folded_terms[target] = []
+                self.folded_terms[target].append(term)
+
+    def get(self, term, default=None):
+        if term in self._aliases:
+            return default
+        df = 0
+        for segment_term in [term] + self.folded_terms.get(term, []):
+            for segment in self._segments:
+                df += segment.terms.get(segment_term, 0)
+        return df if df > 0 else default
+
+    def __contains__(self, term):
+        return self.get(term) is not None
+
+    def __getitem__(self, term):
+        df = self.get(term)
+        if df is None:
+            raise KeyError(term)
+        return df
+
+    def __iter__(self):
+        last = None
+        for term in heapq.merge(*[segment.terms for segment in self._segments], key=lambda t: t.encode('utf-8')):
+            if term != last and term not in self._aliases:
+                yield term
+            last = term
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def keys(self):
+        return iter(self)
+
+
+class SegmentedTable:
+    """Rows of the tables of all the segments, viewed as one table indexed by the global doc id."""
+
+    def __init__(self, tables):
+        self._tables = tables
+        self._bases = []
+        base = 0
+        for table in tables:
+            self._bases.append(base)
+            base += len(table)
+        self._length = base
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, doc_id):
+        segment = bisect.bisect_right(self._bases, doc_id) - 1
+        return self._tables[segment][doc_id - self._bases[segment]]
+
+
+class Segment:
+    """
+    A segment saved by IndexWriter, opened with mmap. Posting lists are paged in only when a query reads them.
+    The doc ids of the segment start at doc_base.
+    """
+
+    def __init__(self, path, info, doc_base):
+        self.path = path
+        self.info = info
+        self.doc_base = doc_base
+        self.lexicon = np.load(path + '.lexicon.npy', mmap_mode='r')
+        self.terms = TermDictionary(self.lexicon, map_file(path + '.terms'))
+        self.docs = np.load(path + '.docs.npy', mmap_mode='r')
+        self.doc_ids = np.load(path + '.ids.npy', mmap_mode='r')
+        self._postings = map_file(path + '.postings')
+        self._positions = map_file(path + '.positions') if info.get('positional') else None
+
+    def get_posting_list(self, term):
+        """
+        :param term: the term
+        :return: posting list of the term viewing the mapped file, None if the term is not in the segment
+        """
+        row = self.terms.find(term)
+        if row == -1:
+            return None
+        return self._posting_list(row)
+
+    def _posting_list(self, row):
+        """
+        the weights are computed with the idf of the term when the segment was saved, the one the norms of
+        its documents were computed with.
+        """
+        df, offset, doc_ids_length, tfs_length = [int(value) for value in self.lexicon[row][
+            ['df', 'postings_offset', 'doc_ids_length', 'tfs_length']]]
+        idf = float(self.lexicon['idf'][row])
+
+        if self.info['compressed']:
+            posting_list = CompressedPostingList(self._postings, offset, df, doc_ids_length, tfs_length,
+                                                 self.docs['max_freq_term'], self.doc_base, idf)
+        else:
+            doc_ids = np.frombuffer(self._postings, dtype=np.int32, count=df, offset=offset)
+            normalized_tfs = np.frombuffer(self._postings, dtype=np.float32, count=df, offset=offset + 4 * df)
+            tfs = np.frombuffer(self._postings, dtype=np.uint16, count=df, offset=offset + 8 * df)
+            if self.doc_base:
+                doc_ids = doc_ids + self.doc_base
+            posting_list = PostingList(doc_ids, tfs, normalized_tfs, term_weights(idf, normalized_tfs))
+        return posting_list
+
+    def get_occurrences(self, term):
+        """
+        :param term: the term
+        :return: numpy arrays of the doc id and the position of every occurrence of the term,
+        None if the term is not in the segment
+        """
+        row = self.terms.find(term)
+        if row == -1:
+            return None
+        positions_offset, position_counts_length, positions_length = [int(value) for value in self.lexicon[row][
+            ['positions_offset', 'position_counts_length', 'positions_length']]]
+        counts = vbyte.decode_array(self._positions, positions_offset, position_counts_length)
+        positions = vbyte.decode_position_gaps_array(self._positions, positions_offset + position_counts_length,
+                                                     positions_length, counts)
+        doc_ids = np.asarray(self._posting_list(row).doc_ids, dtype=np.int64)
+        return np.repeat(doc_ids, counts), positions
+
+    def compression_report(self, max_postings=1000000):
+        """
+        measures the size of the posting lists and how fast they are decoded, next to the fixed width
+        layout (int32 doc id, float32 normalized tf, uint16 tf) of an uncompressed index.
+        the largest posting lists, up to max_postings postings, are decoded.
+        :return: dictionary of the measures
+        """
+        number_of_postings = max(self.info['postings'], 1)
+        report = {'postings': self.info['postings'],
+                  'bytes_per_posting': len(self._postings) / number_of_postings,
+                  'raw_bytes_per_posting': RAW_POSTING_SIZE}
+
+        rows, sampled = [], 0
+        for row in np.argsort(self.lexicon['df'], kind='stable')[::-1]:
+            if sampled >= max_postings:
+                break
+            rows.append(row)
+            sampled += int(self.lexicon['df'][row])
+        sampled = max(sampled, 1)
+
+        start = time.perf_counter()
+        decoded = []
+        for row in rows:
+            posting_list = self._posting_list(row)
+            decoded.append((posting_list.doc_ids, posting_list.tfs, posting_list.normalized_tfs,
+                            posting_list.weights))
+        report['decode_postings_per_sec'] = sampled / max(time.perf_counter() - start, 1e-9)
+
+        start = time.perf_counter()
+        for row in rows:
+            for _ in self._posting_list(row):
+                pass
+        report['streaming_decode_postings_per_sec'] = sampled / max(time.perf_counter() - start, 1e-9)
+
+        raw = [(np.asarray(doc_ids, dtype=np.int32).tobytes(), np.asarray(normalized_tfs, dtype=np.float32).tobytes(),
+                np.asarray(tfs, dtype=np.uint16).tobytes()) for doc_ids, tfs, normalized_tfs, _ in decoded]
+        start = time.perf_counter()
+        for doc_ids, normalized_tfs, tfs in raw:
+            np.frombuffer(doc_ids, dtype=np.int32).copy()
+            np.frombuffer(normalized_tfs, dtype=np.float32).copy()
+            np.frombuffer(tfs, dtype=np.uint16).copy()
+        report['raw_decode_postings_per_sec'] = sampled / max(time.perf_counter() - start, 1e-9)
+        return report
+
+
+class DiskIndex:
+    """
+    An index saved as a manifest and the segments it lists. The segments are searched as one index:
+    document frequencies are summed, doc ids of a segment follow the doc ids of the segments before it.
+    The files of a segment are never written over (see segment_name), a DiskIndex keeps reading the index
+    it opened while a newer generation of the index is saved at the same path.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.manifest = utils.load_obj(path)
+        if not isinstance(self.manifest, dict) or self.manifest.get('format') != FORMAT_VERSION:
+            raise ValueError('{} is not an index of format {}'.format(path, FORMAT_VERSION))
+
+        self.segments = []
+        doc_base = 0
+        for info in self.manifest['segments']:
+            self.segments.append(Segment(os.path.join(os.path.dirname(path), info['name']), info, doc_base))
+            doc_base += info['documents']
+
+        self.aliases = self.manifest['aliases']
+        if len(self.segments) == 1 and not self.aliases:
+            segment = self.segments[0]
+            self.terms, self.docs, self.doc_ids = segment.terms, segment.docs, segment.doc_ids
+        else:
+            self.terms = SegmentedTermDictionary(self.segments, self.aliases)
+            self.docs = SegmentedTable([segment.docs for segment in self.segments])
+            self.doc_ids = SegmentedTable([segment.doc_ids for segment in self.segments])
+
+    @property
+    def generation(self):
+        return self.manifest['generation']
+
+    @property
+    def positional(self):
+        return all(segment.info.get('positional', False) for segment in self.segments)
+
+    def get_posting_list(self, term):
+        """
+        every segment weights its postings with the idf the term had when the segment was saved, so the weights
+        of a document stay the ones its norm was computed with - the weights of the older segments are not
+        refreshed as the index grows.
+        :param term: the term
+        :return: posting list of the term over all the segments, None if the term is not in the index
+        """
+        if term in self.aliases:
+            return None
+        if len(self.segments) == 1 and not self.aliases:
+            return self.segments[0].get_posting_list(term)
+
+        if self.terms.get(term) is None:
+            return None
+
+        posting_lists = []
+        for segment in self.segments:
+            for segment_term in [term] + self.terms.folded_terms.get(term, []):
+                posting_list = segment.get_posting_list(segment_term)
+                if posting_list is not None:
+                    posting_lists.append(posting_list)
+        if not posting_lists:
+            return None
+        return posting_lists[0] if len(posting_lists) == 1 else ChainedPostingList(posting_lists)
+
+    def get_occurrences(self, term):
+        """
+        :param term: the term
+        :return: numpy arrays of the doc id and the position of every occurrence of the term over all the segments
+        """
+        occurrences = []
+        if term not in self.aliases:
+            folded_terms = getattr(self.terms, 'folded_terms', {}).get(term, [])
+            for segment in self.segments:
+                for segment_term in [term] + folded_terms:
+                    segment_occurrences = segment.get_occurrences(segment_term)
+                    if segment_occurrences is not None:
+                        occurrences.append(segment_occurrences)
+        if not occurrences:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate([doc_ids for doc_ids, _ in occurrences]), \
+            np.concatenate([positions for _, positions in occurrences])
@@ -1,22 +1,62 @@
 # DO NOT MODIFY CLASS NAME
-from datetime import datetime
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+import numpy as np
 import utils
+import spimi
+from disk_index import DiskIndex, IndexWriter, inverse_document_frequency, remove_segments, saved_manifest, \
+    segment_name, write_manifest
 from parser_module import Parse
+from posting_list import PostingList, term_weights
+from reader import TWEET_DATE_FORMAT
+from symspell import SymSpell
 
 
 class Indexer:
+    TERMS_TO_REMOVE = {'covid', '19', 'mask', 'wear', 'coronavirus', 'virus'}  # most frequent words in the corpus
+    POSTING_SIZE = 10  # bytes of a single posting in a PostingList
+    POSITION_SIZE = 8  # bytes of a single position in a PostingList, with its share of the counts
+    TERM_SIZE = 350  # estimated bytes of an empty PostingList and its entry in postingDict
+
     # DO NOT MODIFY THIS SIGNATURE
     # You can change the internal implementation as you see fit.
     def __init__(self, config):
-        self.docs_dict = {}
+        self.docs_dict = {}  # doc id to [doc length, date (seconds since the epoch), max_freq_term, norm]
+        self.doc_ids = []  # doc id to tweet id
         self.inverted_idx = {}
         self.postingDict = {}
         self.spell_dict = {}
-        self.not_finished_capital = {}
+        self._spell_index = None  # symmetric delete spelling index of the words of the index, see spell_index
+        self._spell_index_fns = None  # the spelling indexes of the saved segments, loaded on first use
         self.config = config
+        self.positional = config.positionalIndex  # keep the positions of the terms in the documents
         self.index_path = config.savedFileMainFolder
+        self.index_fn = "inverted_idx.pkl"
+        self.generation = 0  # generation of the index, increased whenever documents are added or it is saved
         self.last_doc = False
 
+        # SPIMI - postings are flushed into sorted blocks on disk once the memory budget is exceeded
+        self.memory_budget = config.indexMemoryBudget * 1024 * 1024 if config.indexMemoryBudget else None
+        self.postings_in_memory = 0
+        self.positions_in_memory = 0
+        self.blocks = []
+        self.blocks_dir = None
+
+        # the saved index, read through mmap
+        self.disk_index = None
+        self.document_columns = {}  # columns of the documents table as arrays indexed by doc id, for ranking
+        self.doc_norms = None  # squared norms of the document vectors, summed while the index is finalized
+        self.finalized = False  # the weights and norms of the in-memory index are set, see save_index
+
+        # when appending to a saved index - its segments, and the upper-case terms they kept
+        self.base_index = None
+        self.capital_terms = set()
+
+        # terms (and their postings) folded into another term or dropped when the index is finalized
+        self.finalize_report = dict.fromkeys(['folded_terms', 'folded_postings', 'dropped_terms', 'dropped_postings'], 0)
+
     # DO NOT MODIFY THIS SIGNATURE
     # You can change the internal implementation as you see fit.
     def add_new_doc(self, document):
@@ -30,86 +70,295 @@ class Indexer:
 
         document_dictionary = document.term_doc_dictionary
         max_freq_term = document.max_freq_term
+        doc_id = len(self.doc_ids)
+        if document_dictionary:
+            self.finalized = False
+            self.generation += 1
+            self.doc_ids.append(document.tweet_id)
+            self.docs_dict[doc_id] = [document.doc_length, self.tweet_timestamp(document.tweet_date), max_freq_term, 0.0]
+
         # Go over each term in the doc
         for term in document_dictionary.keys():
             try:
                 # Update inverted index and posting
-                if term not in self.inverted_idx.keys():
+                if term not in self.inverted_idx:
                     self.inverted_idx[term] = 1
-                    self.postingDict[term] = []
                     self.spell_dict[term] = document_dictionary[term]
                 else:
                     self.inverted_idx[term] += 1
                     self.spell_dict[term] += document_dictionary[term]
 
-                term_freq = document_dictionary[term]
-                self.postingDict[term].append((document.tweet_id, document_dictionary[term], term_freq / max_freq_term))
+                if term not in self.postingDict:
+                    self.postingDict[term] = PostingList()
 
-                if document.tweet_id not in self.docs_dict:
-                    tweet_date = document.tweet_date
-                    date_in_hours = self.date_diff(tweet_date)
-                    self.docs_dict[document.tweet_id] = [document.doc_length, date_in_hours, max_freq_term]
+                term_freq = document_dictionary[term]
+                positions = None
+                if self.positional:
+                    positions = sorted(document.location_dict.get(term, ()))
+                    self.positions_in_memory += len(positions)
+                self.postingDict[term].append(doc_id, term_freq, term_freq / max_freq_term, positions)
+                self.postings_in_memory += 1
 
             except:
                 print('problem with the following key {}'.format(term[0]))
 
+        if self.memory_budget is not None and self.memory_in_use() > self.memory_budget:
+            self.flush_block()
+
         if self.last_doc:
-            self.remove_capital_entity()
-            self.save_index("inverted_idx.pkl")
-            self.save_spell("spell_dict")
+            if not self.blocks:
+                self.remove_capital_entity()
+            self.save_index(self.index_fn)
+            self.base_index = None
+            self.last_doc = False
 
-    def date_diff(self, tweet_date):
+    def memory_in_use(self):
         """
-        calculates tweet date in minutes
-        :param tweet_date:
-        :return:
+        estimates the memory held by the postings which were not flushed to disk yet.
+        :return: estimated size in bytes
         """
-        current_time = datetime.now()
+        return self.postings_in_memory * Indexer.POSTING_SIZE + self.positions_in_memory * Indexer.POSITION_SIZE + \
+            len(self.postingDict) * Indexer.TERM_SIZE
 
-        tweet_date_as_a_DATE = datetime.strptime(tweet_date, '%a %b %d %H:%M:%S +0000 %Y')
-        date_sub = current_time - tweet_date_as_a_DATE
+    def flush_block(self):
+        """
+        writes the in-memory postings to disk as a block sorted by term and clears them from memory.
+        :return: -
+        """
+        if self.blocks_dir is None:
+            self.blocks_dir = tempfile.mkdtemp(prefix="blocks_", dir=self.index_path or None)
+        block_path = os.path.join(self.blocks_dir, "block_{}.pkl".format(len(self.blocks)))
+        spimi.write_block(block_path, self.postingDict)
+        self.blocks.append(block_path)
+        self.postingDict = {}
+        self.postings_in_memory = 0
+        self.positions_in_memory = 0
 
-        date_in_minutes = int((date_sub.days * 60 * 24) + (date_sub.seconds // 3600))
-        return date_in_minutes
+    def merge_blocks(self, index_writer):
+        """
+        merges all the blocks into the saved index, applying the capital letter and entity rules
+        on the way. the posting lists are streamed from the blocks to the index writer.
+        :param index_writer: IndexWriter of the index being saved
+        :return: -
+        """
+        if self.postingDict:
+            self.flush_block()
+
+        for group in spimi.merge_blocks(self.blocks):
+            for term, posting_list in self.fold_terms(group):
+                index_writer.add_posting_list(term, posting_list, self.set_weights(term, posting_list))
+
+        spimi.remove_blocks(self.blocks)
+        shutil.rmtree(self.blocks_dir, ignore_errors=True)
+        self.blocks = []
+        self.blocks_dir = None
+
+    @staticmethod
+    def tweet_timestamp(tweet_date):
+        """
+        :param tweet_date: the date of the tweet in seconds since the epoch, as given by the reader,
+        or as a string (example --> 'Wed Jul 08 19:30:15 +0000 2020')
+        :return: the date in seconds since the epoch (UTC)
+        """
+        if isinstance(tweet_date, str):
+            return int(datetime.strptime(tweet_date, TWEET_DATE_FORMAT).replace(tzinfo=timezone.utc).timestamp())
+        return int(tweet_date)
 
     def remove_capital_entity(self):
         """
         when indexing is finished, we remove entities that appear in the corpus
         less then 2 times, 5 most frequent words in the corpus.
         in addition, words with upper_case appearance that have lower-case appearance, are removed
-        and their values are added to the lower-case terms.
+        and their values are added to the lower-case terms. terms of a single document are removed as well.
+        only the terms a rule applies to are visited, see fold_terms for the rules.
         :return:
         """
-        keys_to_remove = {'covid', '19', 'mask', 'wear', 'coronavirus', 'virus'}
-        for key in self.inverted_idx:
-            if key in Parse.ENTITY_DICT and Parse.ENTITY_DICT[key] < 2:
-                if key in self.inverted_idx:
-                    keys_to_remove.add(key)
-
-            elif key in Parse.CAPITAL_LETTER_DICT and Parse.CAPITAL_LETTER_DICT[key] is False:
-                if key in self.inverted_idx:
-                    count_docs = self.inverted_idx[key]
-                    posting_file = self.postingDict[key]
-                    keys_to_remove.add(key)
-
-                    if key.lower() in self.postingDict:
-                        self.inverted_idx[key.lower()] += count_docs
-                        self.postingDict[key.lower()].extend(posting_file)
-                    else:
-                        self.not_finished_capital[key.lower] = [count_docs, posting_file]
-
-            if key in self.not_finished_capital:
-                count_docs_to_delete = self.not_finished_capital[key][0]
-                posting_dict_to_delete = self.not_finished_capital[key][1]
-                self.inverted_idx[key.lower()] += count_docs_to_delete
-                self.postingDict[key.lower()].extend(posting_dict_to_delete)
-
-            if self.inverted_idx[key] == 1:
-                keys_to_remove.add(key)
-
-        for key in keys_to_remove:
-            del self.inverted_idx[key]
-            del self.postingDict[key]
+        removed = [term for term in Indexer.TERMS_TO_REMOVE if term in self.inverted_idx]
+        removed.extend(term for term, count in Parse.ENTITY_DICT.items() if count < 2 and term in self.inverted_idx)
+        for term in removed:
+            self.drop_term(term)
+
+        folded = [term for term, value in Parse.CAPITAL_LETTER_DICT.items() if value is False and
+                  term in self.inverted_idx]
+        for term in folded:
+            posting_list = self.postingDict.pop(term)
+            lower = term.lower()
+            if lower in self.inverted_idx:
+                self.inverted_idx[lower] += self.inverted_idx[term]
+                self.postingDict[lower].extend(posting_list)
+                self.count_folded(posting_list)
+            elif self.base_df(lower) > 0:
+                self.inverted_idx[lower] = self.inverted_idx[term]
+                self.postingDict[lower] = posting_list
+                self.count_folded(posting_list)
+            else:
+                self.count_dropped(posting_list)
+            del self.inverted_idx[term]
+
+        single = [term for term, df in self.inverted_idx.items() if df < 2 and df + self.saved_df(term) < 2]
+        for term in single:
+            self.drop_term(term)
+
+    def drop_term(self, term):
+        """
+        removes a term held in memory from the index.
+        :param term: the term
+        :return: -
+        """
+        self.count_dropped(self.postingDict.pop(term))
+        del self.inverted_idx[term]
+
+    def count_folded(self, posting_list):
+        self.finalize_report['folded_terms'] += 1
+        self.finalize_report['folded_postings'] += len(posting_list)
+
+    def count_dropped(self, posting_list):
+        self.finalize_report['dropped_terms'] += 1
+        self.finalize_report['dropped_postings'] += len(posting_list)
+
+    @staticmethod
+    def removed_term(term):
+        """
+        :param term: a term in the index
+        :return: True if the term is removed by the stop word or the entity rule
+        """
+        return term in Indexer.TERMS_TO_REMOVE or (term in Parse.ENTITY_DICT and Parse.ENTITY_DICT[term] < 2)
+
+    def fold_terms(self, group):
+        """
+        applies the removal rules of remove_capital_entity on all the case variants of a single word.
+        upper-case terms are folded into their lower-case term (when it exists in the index).
+        when appending to a saved index, the lower-case term may exist only in the older segments,
+        and the document frequency of a term counts the older segments as well (see saved_df).
+        the document frequencies in the inverted index are updated accordingly.
+        :param group: list of (term, posting list) tuples sharing the same lower-case form
+        :return: list of the (term, posting list) tuples that are kept in the index
+        """
+        postings = dict(group)
+        for term, posting_list in group:
+            if self.removed_term(term):
+                del postings[term]
+                self.count_dropped(posting_list)
+
+            elif Parse.CAPITAL_LETTER_DICT.get(term) is False:
+                if term.lower() in postings:
+                    self.inverted_idx[term.lower()] += self.inverted_idx[term]
+                    postings[term.lower()].extend(posting_list)
+                    self.count_folded(posting_list)
+                elif self.base_df(term.lower()) > 0:
+                    self.inverted_idx[term.lower()] = self.inverted_idx[term]
+                    postings[term.lower()] = posting_list
+                    self.count_folded(posting_list)
+                else:
+                    self.count_dropped(posting_list)
+                del postings[term]
+
+        for term, _ in group:
+            if term not in postings:
+                del self.inverted_idx[term]
+
+        kept = []
+        for term, posting_list in postings.items():
+            if self.inverted_idx[term] + self.saved_df(term) > 1:
+                kept.append((term, posting_list))
+            else:
+                del self.inverted_idx[term]
+                self.count_dropped(posting_list)
+
+        return kept
+
+    def idf(self, term):
+        """
+        :param term: a term of the in-memory index
+        :return: idf of the term, counting the documents of the saved index being appended to
+        """
+        number_of_documents = len(self.doc_ids)
+        if self.base_index is not None:
+            number_of_documents += len(self.base_index.docs)
+        return inverse_document_frequency(number_of_documents, self.inverted_idx[term] + self.saved_df(term))
+
+    def set_weights(self, term, posting_list):
+        """
+        computes the tf-idf weights of a posting list, once the document frequency of its term is final.
+        :param term: the term
+        :param posting_list: PostingList of the term
+        :return: idf of the term
+        """
+        idf = self.idf(term)
+        posting_list.weights = term_weights(idf, posting_list.normalized_tfs)
+        np.add.at(self.doc_norms, np.asarray(posting_list.doc_ids), posting_list.weights.astype(np.float64) ** 2)
+        return idf
+
+    def set_norms(self):
+        """
+        once the weights of all the terms are set, stores the norm of every document vector in docs_dict.
+        :return: -
+        """
+        norms = np.sqrt(self.doc_norms)
+        for doc_id, row in self.docs_dict.items():
+            row[3] = float(norms[doc_id])
+        self.doc_norms = None
+        self.document_columns = {}
+        self.finalized = True
+
+    def base_df(self, term):
+        """
+        :param term: the term
+        :return: document frequency of the term in the saved index being appended to
+        """
+        if self.base_index is None:
+            return 0
+        return self.base_index.terms.get(term, 0)
+
+    def saved_df(self, term):
+        """
+        the upper-case form of a term kept in the older segments is folded into the term once the term is seen
+        in lower-case in the new documents (see capital_aliases), so its documents count for the term.
+        :param term: the term
+        :return: document frequency of the term in the saved index being appended to, after the folding
+        """
+        df = self.base_df(term)
+        upper = term.upper()
+        if upper != term and upper in self.capital_terms and Parse.CAPITAL_LETTER_DICT.get(upper) is False:
+            df += self.base_df(upper)
+        return df
+
+    def open_segment(self, fn):
+        """
+        prepares the indexer to append documents to a saved index as a new segment.
+        the corpus statistics of the saved index are restored, so the capital letter and entity
+        rules see the whole corpus. only the new documents are held in memory.
+        :param fn: file name of the saved index
+        :return: -
+        """
+        self.load_index(fn)
+        self.base_index = self.disk_index
+        self.disk_index = None
+        self.index_fn = fn
+        self.docs_dict = {}
+        self.doc_ids = []
+        self.inverted_idx = {}
+        self.postingDict = {}
+        self.spell_dict = {}
+        self.last_doc = False
+        self.finalize_report = dict.fromkeys(self.finalize_report, 0)
+
+        Parse.CAPITAL_LETTER_DICT, Parse.ENTITY_DICT, Parse.AMOUNT_OF_NUMBERS_IN_CORPUS = \
+            utils.load_obj(self.index_path + fn + '.stats')
+        self.capital_terms = {term for term, value in Parse.CAPITAL_LETTER_DICT.items() if value}
+
+    def capital_aliases(self):
+        """
+        upper-case terms kept in the older segments that have been seen in lower-case in the new documents.
+        they are folded into their lower-case term, or removed when the lower-case term is not in the index.
+        :return: dictionary of upper-case term to the term it is folded into (None - removed)
+        """
+        aliases = {}
+        for term in self.capital_terms:
+            if Parse.CAPITAL_LETTER_DICT.get(term) is False and self.base_df(term) > 0:
+                lower = term.lower()
+                aliases[term] = lower if self.base_df(lower) > 0 or lower in self.inverted_idx else None
+        return aliases
 
     # DO NOT MODIFY THIS SIGNATURE
     # You can change the internal implementation as you see fit.
@@ -119,10 +368,16 @@ class Indexer:
         Input:
             fn - file name of pickled index.
         """
-        objects = utils.load_obj(self.index_path+fn)
-        self.postingDict = objects[0]
-        self.inverted_idx = objects[1]
-        self.docs_dict = objects[2]
+        self.disk_index = DiskIndex(self.index_path + fn)
+        self.index_fn = fn
+        self.generation = self.disk_index.generation
+        self.postingDict = {}
+        self._spell_index = None
+        self._spell_index_fns = [segment.path + '.spell' for segment in self.disk_index.segments]
+        self.document_columns = {}
+        self.inverted_idx = self.disk_index.terms
+        self.docs_dict = self.disk_index.docs
+        self.doc_ids = self.disk_index.doc_ids
 
     # DO NOT MODIFY THIS SIGNATURE
     # You can change the internal implementation as you see fit.
@@ -132,10 +387,90 @@ class Indexer:
         Input:
               fn - file name of pickled index.
         """
-        utils.save_obj((self.postingDict, self.inverted_idx, self.docs_dict), fn)
+        if self.base_index is None:
+            segments, aliases = [], {}
+        else:
+            segments, aliases = self.base_index.manifest['segments'], dict(self.base_index.manifest['aliases'])
+        # an index saved over another one (or over the index appended to) follows its generation,
+        # so the results cached for the index it replaces are never taken for its own
+        previous_manifest = saved_manifest(self.index_path + fn)
+        generation = max(self.generation, previous_manifest['generation'] if previous_manifest else 0) + 1
+
+        index_writer = IndexWriter(self.index_path + segment_name(fn, generation), self.config.compressPostings,
+                                   self.positional)
+        self.doc_norms = np.zeros(len(self.doc_ids))
+        if self.blocks:
+            self.merge_blocks(index_writer)
+            spilled = True
+        else:
+            for term, posting_list in self.postingDict.items():
+                index_writer.add_posting_list(term, posting_list, self.set_weights(term, posting_list))
+            spilled = False
+        self.set_norms()
+        index_writer.write_documents(self.docs_dict, self.doc_ids)
+        segment_info = index_writer.close()
+        self.save_spell(index_writer.path)
+
+        if self.base_index is not None:
+            aliases.update(self.capital_aliases())
+        segments = segments + [segment_info]
+        retired = []
+        if previous_manifest is not None:
+            names = {info['name'] for info in segments}
+            retired = [info['name'] for info in previous_manifest['segments'] if info['name'] not in names]
+        write_manifest(self.index_path + fn, segments, aliases, generation, retired)
+        if previous_manifest is not None:
+            # the readers have had a whole generation to move on from the segments the previous manifest retired
+            remove_segments(os.path.dirname(self.index_path + fn), previous_manifest.get('retired', []))
+        self.generation = generation
+        utils.replace_obj((Parse.CAPITAL_LETTER_DICT, Parse.ENTITY_DICT, Parse.AMOUNT_OF_NUMBERS_IN_CORPUS),
+                          self.index_path + fn + '.stats')
+
+        print('Finalize: folded {folded_terms} terms ({folded_postings} postings), '
+              'dropped {dropped_terms} terms ({dropped_postings} postings)'.format(**self.finalize_report))
+
+        if spilled or self.base_index is not None:
+            # the postings are only on disk now, or the new segment has to be searched with the older ones
+            self.load_index(fn)
+
+    @property
+    def spell_index(self):
+        """
+        the spelling index, the ones of the saved segments are loaded and merged on first use
+        (only the spell checker of the queries needs it).
+        :return: SymSpell, None when no spelling index was saved
+        """
+        if self._spell_index is None and self._spell_index_fns is not None:
+            for fn in self._spell_index_fns:
+                if not os.path.exists(fn):
+                    continue
+                if self._spell_index is None:
+                    self._spell_index = utils.load_obj(fn)
+                else:
+                    self._spell_index.update(utils.load_obj(fn))
+            self._spell_index_fns = None
+        return self._spell_index
 
-    def save_spell(self, fn):
-        utils.save_json_file(self.spell_dict, fn)
+    @spell_index.setter
+    def spell_index(self, spell_index):
+        self._spell_index = spell_index
+        self._spell_index_fns = None
+
+    def save_spell(self, segment_path):
+        """
+        saves the spelling index of a new segment next to it, holding only the words the segment adds to
+        the index - when appending to a saved index, the words of its spelling index are left out.
+        the spelling index of the whole index is then made of the ones of its segments, see spell_index.
+        :param segment_path: path of the segment files, without their suffix
+        :return: -
+        """
+        base_spell_index = self.spell_index if self.base_index is not None else None
+        spell_index = SymSpell()
+        spell_index.add_words(term for term in self.spell_dict
+                              if base_spell_index is None or not base_spell_index.known(term))
+        utils.save_obj(spell_index, segment_path + '.spell')
+        if self.base_index is None:
+            self.spell_index = spell_index
 
     # feel free to change the signature and/or implementation of this function
     # or drop altogether.
@@ -143,6 +478,8 @@ class Indexer:
         """
         Checks if a term exist in the dictionary.
         """
+        if self.disk_index is not None:
+            return term in self.disk_index.terms
         return term in self.postingDict
 
     # feel free to change the signature and/or implementation of this function 
@@ -151,4 +488,89 @@ class Indexer:
         """
         Return the posting list from the index for a term.
         """
-        return self.postingDict[term] if self._is_term_exist(term) else []
\ No newline at end of file
+        if self.disk_index is not None:
+            posting_list = self.disk_index.get_posting_list(term)
+            return posting_list if posting_list is not None else []
+        if term not in self.postingDict:
+            return []
+        posting_list = self.postingDict[term]
+        if not self.finalized:
+            # the index is still being built, the weights are computed with the current document frequency
+            return PostingList(posting_list.doc_ids, posting_list.tfs, posting_list.normalized_tfs,
+                               term_weights(self.idf(term), posting_list.normalized_tfs))
+        return posting_list
+
+    def get_term_occurrences(self, term):
+        """
+        Return the doc id and the position of every occurrence of a term in the index.
+        :return: numpy arrays of the doc ids and the positions, None if the index keeps no positions
+        """
+        if self.disk_index is not None:
+            return self.disk_index.get_occurrences(term) if self.disk_index.positional else None
+        if not self.positional:
+            return None
+        if term in self.postingDict:
+            return self.postingDict[term].occurrences()
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    def index_version(self):
+        """
+        :return: identifies the index searched, changes whenever the index is saved or another index is loaded
+        """
+        return self.index_path + self.index_fn, self.generation
+
+    def document_column(self, name, position, dtype):
+        """
+        :param name: name of the column in the saved documents table
+        :param position: position of the column in the rows of docs_dict
+        :param dtype: type of the column
+        :return: numpy array of the column, indexed by doc id
+        """
+        column = self.document_columns.get(name)
+        if column is None or len(column) != len(self.doc_ids):
+            if self.disk_index is not None:
+                column = np.concatenate([segment.docs[name] for segment in self.disk_index.segments])
+            else:
+                column = np.zeros(len(self.doc_ids), dtype=dtype)
+                for doc_id, row in self.docs_dict.items():
+                    column[doc_id] = row[position]
+            self.document_columns[name] = column
+        return column
+
+    def document_dates(self):
+        """
+        :return: numpy array of the document dates (seconds since the epoch), indexed by doc id
+        """
+        return self.document_column('date', 1, np.int64)
+
+    def document_norms(self):
+        """
+        :return: numpy array of the norms of the document tf-idf vectors, indexed by doc id
+        """
+        if self.disk_index is None and not self.finalized:
+            return self.current_norms()
+        return self.document_column('norm', 3, np.float64)
+
+    def current_norms(self):
+        """
+        the norms of the documents of an index which is still being built, with the current document frequencies.
+        they are computed at the first search, and again once more documents are added.
+        :return: numpy array of the norms of the document tf-idf vectors, indexed by doc id
+        """
+        norms = self.document_columns.get('current_norm')
+        if norms is None or len(norms) != len(self.doc_ids):
+            norms = np.zeros(len(self.doc_ids))
+            for term, posting_list in self.postingDict.items():
+                weights = term_weights(self.idf(term), posting_list.normalized_tfs).astype(np.float64)
+                np.add.at(norms, np.asarray(posting_list.doc_ids), weights ** 2)
+            norms = np.sqrt(norms)
+            self.document_columns['current_norm'] = norms
+        return norms
+
+    def tweet_id(self, doc_id):
+        """
+        :param doc_id: doc id
+        :return: the tweet id of the document
+        """
+        tweet_id = self.doc_ids[doc_id]
+        return tweet_id.decode() if isinstance(tweet_id, bytes) else tweet_id
@@ -1,3 +1,4 @@
+import copy
 import re
 import string
 from nltk.corpus import stopwords
@@ -6,27 +7,39 @@ from document import Document
 import json
 from nltk.stem.snowball import SnowballStemmer
 from query import query_object
+from term_cache import TermCache
 
 
 class Parse:
-    """This Class Handel's The Parsing of the Tweets. """
+    """
+    This Class Handel's The Parsing of the Tweets.
+    The statistics of the corpus are kept on the class and are only updated while parsing docs.
+    A query is parsed on a copy of the parser holding the state of the query alone, so queries
+    can be parsed by several threads at once (docs are parsed by one thread).
+    """
 
     CAPITAL_LETTER_DICT = {}  # keeps all the terms with the capital letters in the corpus
     ENTITY_DICT = {}  # keeps all the Entities in the corpus
-    Parsing_a_word = False  # a Boolean to check if we parse a doc or a query
     AMOUNT_OF_NUMBERS_IN_CORPUS = 0
 
+    # token kinds, see classify_token
+    SKIP, WORD, HYPHEN, MENTION, HASHTAG, DATE, NUMBER, SLASH, OTHER = range(9)
+
     def __init__(self):
 
         # All the Data structure for the Parsing process
 
         self.problem_terms_to_check = []
+        self.Parsing_a_word = False  # a Boolean to check if we parse a doc or a query
         self.max_freq_term = 0
         self.term_dict = {}
         self.tokens = None
         self.location_dict = {}
         self.snow_stemmer = SnowballStemmer(language='english')
+        self.TOKENIZER = "nltk"  # "nltk" - nltk's word_tokenize, "regex" - regex_tokenize
+        self.term_cache = None  # TermCache of the stems and normalized tokens, shared by docs and queries
         self.is_num_after_num = False
+        self.lower_case_seen = None  # upper-case forms of lower-case words, collected when parsing in a ParserPool
 
         ####################################################################
 
@@ -59,6 +72,7 @@ class Parse:
         self.url_pattern_query = re.compile(
             'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
         self.split_url_pattern = re.compile(r"[\w'|.|-]+")
+        self.phrase_pattern = re.compile(r'"([^"]+)"(?:~(\d+))?')  # "herd immunity", "herd immunity"~5
         self.non_latin_pattern = re.compile(
             pattern=r'[^\x00-\x7F\x80-\xFF\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF\u2019]')
         self.emojis_pattern = re.compile(
@@ -66,29 +80,37 @@ class Parse:
                     u"\ufe0f"u"\U0001F1E0-\U0001F1FF"u"\u2640-\u2642"u"\u200d"u"\U00002500-\U00002BEF"u"\U00010000-\U0010ffff"u"\U0001f926-\U0001f937"u"\U000024C2-\U0001F251"u"\u23cf"
                     u"\u23e9"u"\u231a"u"\u2600-\u2B55""]+", flags=re.UNICODE)
 
+        # regex tokenizer - see regex_tokenize
+        self.open_quote_pattern = re.compile(r'(^|[ (\[{<])"')
+        self.token_pattern = re.compile(r"""
+            \.{2,}|--|``|''                                   # ellipsis, dashes and quotes
+          | [;@#$%&?!()\[\]{}<>*“”‘’«»„`]                      # punctuation split from the words
+          | [,:](?!\d)                                        # commas and colons, except inside numbers
+          | (?i:(?<![\w'])(?:can(?=not\b)|gim(?=me\b)|gon(?=na\b)|got(?=ta\b)|lem(?=me\b)|wan(?=na\s)))  # can not, gon na
+          | (?:[^\s;@#$%&?!()\[\]{}<>*“”‘’«»„`,:.\-']|[,:](?=\d)|\.(?!\.)|-(?!-)|'(?!'))+  # words
+          """, re.VERBOSE)
+        self.apostrophe_pattern = re.compile(
+            r"^(')(?!(?i:re|ve|ll|m|t|s|d|n)\b)|(?<=[^'])((?i:'s|'m|'d|'ll|'re|'ve|n't)|')$")
+        self.closing_tokens = {']', ')', '}', '>', "''", "'"}
+
         ####################################################################
 
-    def parse_sentence(self, text):
+    def parse_sentence(self, text, text_tokens=None):
         """
         This function tokenizes, removes stop words and applies lower case for every word within the text
         :param text: the final text to parse for the query or the doc
+        :param text_tokens: the tokens of text, when it is already tokenized
         :return: term_dict: a dict contains the parsed terms as keys and the values are the frequency of the term in the doc or the query
         """
-
-        text_tokens = word_tokenize(text)
+        if text_tokens is None:
+            text_tokens = self.tokenize(text)
         text_tokens_without_stopwords = [w for w in text_tokens if w not in self.stop_words_dict]
-        self.tokens = text_tokens_without_stopwords
-
-        last_number_parsed = None
-        count_num_in_a_row = 0
-        entity_counter = 1
-        is_date = False
 
         term_dict = {}
-        if not Parse.Parsing_a_word:
+        if not self.Parsing_a_word:
             term_dict = self.term_dict
 
-        if Parse.Parsing_a_word:
+        if self.Parsing_a_word:
             # if we parse a query we split the urls
             broken_urls = self.url_pattern_query.findall(text)
             broken_urls = self.parse_url_text(broken_urls)
@@ -106,43 +128,104 @@ class Parse:
                     if term_dict[term] > self.max_freq_term:
                         self.max_freq_term = term_dict[term]
 
-        for i, token in enumerate(self.tokens):
-            if token in self.additional:
+        for term, position in self.parse_tokens(text_tokens_without_stopwords):
+            if position is None:  # a number merged into a mixed number (25 3/4)
+                del term_dict[term]
                 continue
-            if entity_counter > 1:
-                entity_counter -= 1
 
-            parsed_token_list = []
-            number_as_list = []
+            if term not in self.location_dict:
+                self.location_dict[term] = [position]
+            else:
+                self.location_dict[term].append(position)
 
-            if not any(c.isalpha() for c in token):
-                number_as_list = self.number_pattern.findall(token)
+            if term not in term_dict:
+                term_dict[term] = 1
+            else:
+                term_dict[term] += 1
+            if term_dict[term] > self.max_freq_term:
+                self.max_freq_term = term_dict[term]
 
-                is_date = self.parse_date(token)  #: date format
+        return term_dict
 
-            if "-" in token and not token.startswith("-"):  # not a number starts with "-". example covid-19
-                token_before = ""
-                if i > 0:
-                    token_before = self.tokens[i - 1]
-                parsed_token_list = self.parse_hyphen(token, token_before)
-                count_num_in_a_row = 0
+    def classify_token(self, token, is_last):
+        """
+        assigns a kind to a token, choosing the parsing rule applied to it.
+        :param token: a token of the text (not a stop word)
+        :param is_last: True for the last token of the text
+        :return: (kind, the token with a leading quote or dash or a trailing period removed,
+                  the numbers found in a number - True for a hyphenated date)
+        """
+        hyphen = "-" in token and token[0] != "-"  # not a number starts with "-". example covid-19
+        if not hyphen and token[0] >= "\u200d" and self.emojis_pattern.match(token):  # no emoji is below \u200d
+            return Parse.SKIP, token, None
+        if token.isalpha():
+            return Parse.WORD, token, None
+
+        trimmed = token
+        if not hyphen:
+            if token[0] == "'" or token[0] == "-":
+                trimmed = token[1:]
+            elif token[-1] == ".":
+                trimmed = token[:-1]
+
+        if trimmed.startswith("@") or trimmed.startswith("#"):
+            if is_last:
+                return (Parse.HYPHEN if hyphen else Parse.OTHER), trimmed, None
+            return (Parse.MENTION if trimmed[0] == "@" else Parse.HASHTAG), trimmed, None
+
+        if not any(c.isalpha() for c in token):
+            if self.date_pattern.search(token) is not None:
+                return (Parse.HYPHEN if hyphen else Parse.DATE), trimmed, True
+            number_as_list = self.number_pattern.findall(token)
+            if number_as_list and not hyphen:
+                return Parse.NUMBER, trimmed, number_as_list
+
+        if hyphen:
+            return Parse.HYPHEN, trimmed, None
+        if "/" in trimmed and "//t" not in trimmed:  # split for token that contains //t or /
+            return Parse.SLASH, trimmed, None
+        return Parse.OTHER, trimmed, None
+
+    def parse_tokens(self, tokens):
+        """
+        applies the parsing rules to the tokens, classifying every token once.
+        the token following a @ or a # is consumed with it, the rest of the tokens are kept in self.tokens.
+        :param tokens: the tokens of the text, without stop words
+        :return: generator of (term, position of the token in self.tokens) pairs.
+        a None position retracts the term - a number merged into the mixed number after it (25 3/4)
+        """
+        kept_tokens = self.tokens = []
+        last_number_parsed = None
+        count_num_in_a_row = 0
+        entity_counter = 1
+        skip_next = False
+        last = len(tokens) - 1
 
-            elif self.emojis_pattern.match(token):
+        for j, token in enumerate(tokens):
+            if skip_next:
+                skip_next = False
+                continue
+            i = len(kept_tokens)
+            kept_tokens.append(token)
+            if token in self.additional:
                 continue
+            if entity_counter > 1:
+                entity_counter -= 1
 
-            elif token.startswith("'") or token.startswith("-"):
-                token = token[1:]
+            is_last = j == last
+            kind, token, number_as_list = self.classify_token(token, is_last)
+            parsed_token_list = []
 
-            elif token.endswith("."):
-                token = token[:-1]
+            if kind == Parse.SKIP:
+                continue
 
-            elif token.isalpha():  #: capital letters and entities
+            elif kind == Parse.WORD:  #: capital letters and entities
                 entity_str = ""
                 if entity_counter == 1:
-                    while token.istitle() and i + entity_counter < len(self.tokens) and (
-                            self.tokens[i + entity_counter].istitle() or self.istitle_with_hyphen(
-                            self.tokens[i + entity_counter])):
-                        entity_str += " " + self.tokens[i + entity_counter]
+                    while token.istitle() and j + entity_counter <= last and (
+                            tokens[j + entity_counter].istitle() or self.istitle_with_hyphen(
+                            tokens[j + entity_counter])):
+                        entity_str += " " + tokens[j + entity_counter]
                         entity_counter += 1
                     entity_counter += 1
 
@@ -150,109 +233,148 @@ class Parse:
                 token += entity_str
                 if entity_str != "":
                     parsed_token_list.append(token)
-                    if not Parse.Parsing_a_word:
-                        if token not in Parse.ENTITY_DICT.keys():
+                    if not self.Parsing_a_word:
+                        if token not in Parse.ENTITY_DICT:
                             Parse.ENTITY_DICT[token] = 1
                         else:
                             Parse.ENTITY_DICT[token] += 1
-
+                    if "/" in token and "//t" not in token:  # an entity taking a word with a slash (Year/)
+                        parsed_token_list.extend(word for word in token.split("/") if len(word) > 1)
                 count_num_in_a_row = 0
 
-            if token.startswith('@'):  #: @ sign
-                if i < len(self.tokens) - 1:
-                    parsed_token_list = []
-                    count_num_in_a_row = 0
-                    self.tokens.pop(i + 1)
+            elif kind == Parse.HYPHEN:
+                token_before = kept_tokens[i - 1] if i > 0 else ""
+                parsed_token_list = self.parse_hyphen(token, token_before)
+                count_num_in_a_row = 0
+                if number_as_list:  # date format
+                    parsed_token_list = [token]
+                elif "/" in token and "//t" not in token:
+                    parsed_token_list.extend(word for word in token.split("/") if len(word) > 1)
 
-            elif token.startswith('#'):  #: # sign
-                if i < len(self.tokens) - 1:
-                    parsed_token_list = self.parse_hashtag(token + self.tokens[i + 1])
-                    count_num_in_a_row = 0
-                    self.tokens.pop(i + 1)
+            elif kind == Parse.MENTION:  #: @ sign
+                count_num_in_a_row = 0
+                skip_next = True
 
+            elif kind == Parse.HASHTAG:  #: # sign
+                parsed_token_list = self.parse_hashtag(token + tokens[j + 1])
+                count_num_in_a_row = 0
+                skip_next = True
 
-            elif is_date:  # date format
+            elif kind == Parse.DATE:  # date format
                 parsed_token_list = [token]
-                is_date = False
 
-            elif len(number_as_list) != 0 and len(parsed_token_list) == 0:  #: numbers
+            elif kind == Parse.NUMBER:  #: numbers
                 if len(number_as_list) > 1:
                     number_as_list = ["".join(number_as_list)]
                 if '-' not in number_as_list[0]:  # if a representation of phone numbers, do nothing
                     count_num_in_a_row += 1
-                    if i == 0 and i < len(self.tokens) - 1:
-                        parsed_token_list = list(self.parse_numbers(number_as_list[0], None, self.tokens[i + 1]))
-                    elif i < len(self.tokens) - 1:
+                    if i == 0 and not is_last:
+                        parsed_token_list = list(self.parse_numbers(number_as_list[0], None, tokens[j + 1]))
+                    elif not is_last:
                         parsed_token_list = list(
-                            self.parse_numbers(number_as_list[0], self.tokens[i - 1], self.tokens[i + 1]))
+                            self.parse_numbers(number_as_list[0], kept_tokens[i - 1], tokens[j + 1]))
                     else:
-                        parsed_token_list = list(self.parse_numbers(number_as_list[0], self.tokens[i - 1], None))
+                        parsed_token_list = list(self.parse_numbers(number_as_list[0], kept_tokens[i - 1], None))
 
                     if count_num_in_a_row == 2 and len(
                             parsed_token_list) == 2:  # for numbers like 25 3/4 that appear together
                         parsed_token_list = [last_number_parsed + " " + parsed_token_list[1]]
                         count_num_in_a_row = 0
-                        del term_dict[last_number_parsed]
+                        yield last_number_parsed, None
                     else:
                         last_number_parsed = parsed_token_list[0]
                 else:
                     parsed_token_list = number_as_list
 
-            elif "/" in token and "//t" not in token:  # split for token that contains //t or /
-                split_slash = token.split("/")
-                for word in split_slash:
-                    if len(word) > 1:
-                        parsed_token_list.append(word)
+            elif kind == Parse.SLASH:  # split for token that contains //t or /
+                parsed_token_list = [word for word in token.split("/") if len(word) > 1]
 
             if len(parsed_token_list) > 0:
                 # if we use one of the parsing rules we add the tokens into the data structure accordingly
-                if self.STEMMER:
-                    parsed_token_list_stemmer = []
-                    for word in parsed_token_list:
-                        if word.isalpha():
-                            parsed_token_list_stemmer.append(self.snow_stemmer.stem(word))
-                        else:
-                            parsed_token_list_stemmer.append(word)
-                    parsed_token_list = parsed_token_list_stemmer
-
                 for term in parsed_token_list:
-                    if term in self.additional:
-                        continue
-                    if term not in self.location_dict:
-                        self.location_dict[term] = [i]
-                    else:
-                        self.location_dict[term].append(i)
-
-                    if term not in term_dict:
-                        term_dict[term] = 1
-                    else:
-                        term_dict[term] += 1
-                    if term_dict[term] > self.max_freq_term:
-                        self.max_freq_term = term_dict[term]
+                    if self.STEMMER and term.isalpha():
+                        term = self.stem(term)
+                    if term not in self.additional:
+                        yield term, i
 
             else:
                 # if we did not use one of the parsing rules we add the tokens into the data structure accordingly
-                if "//t" not in token and token not in self.dict_punctuation and token not in self.stop_words_dict:
-                    is_ascii = self.check_ascii(token)
-                    if is_ascii:
-                        token = token.lower()
+                term = self.normalize_token(token)
+                if term is not None:
+                    yield term, i
 
-                        if self.STEMMER:
-                            token = self.snow_stemmer.stem(token)
+    def stem(self, word):
+        """
+        :param word: a word
+        :return: the stem of the word, memoized in term_cache
+        """
+        if self.term_cache is None:
+            return self.snow_stemmer.stem(word)
+        key = ('stem', word)
+        term = self.term_cache.get(key)
+        if term is TermCache.MISSING:
+            term = self.snow_stemmer.stem(word)
+            self.term_cache.put(key, term)
+        return term
+
+    def normalize_token(self, token):
+        """
+        the term of a token no parsing rule applies to - lower case (and stemmed), memoized in term_cache.
+        :param token: a token
+        :return: the term, None if the token is not indexed (punctuation, a stop word, not ascii or a t.co url)
+        """
+        if self.term_cache is not None:
+            key = ('token', token)
+            term = self.term_cache.get(key)
+            if term is not TermCache.MISSING:
+                return term
+
+        term = None
+        if "//t" not in token and token not in self.dict_punctuation and token not in self.stop_words_dict:
+            if self.check_ascii(token):
+                term = token.lower()
+                if self.STEMMER:
+                    term = self.snow_stemmer.stem(term)
 
-                        if token not in self.location_dict:
-                            self.location_dict[token] = [i]
-                        else:
-                            self.location_dict[token].append(i)
+        if self.term_cache is not None:
+            self.term_cache.put(key, term)
+        return term
 
-                        if token not in term_dict:
-                            term_dict[token] = 1
-                        else:
-                            term_dict[token] += 1
-                        if term_dict[token] > self.max_freq_term:
-                            self.max_freq_term = term_dict[token]
+    def tokenize(self, text):
+        """
+        :param text: text of a doc or a query
+        :return: list of tokens, by the tokenizer selected in TOKENIZER
+        """
+        if self.TOKENIZER == "regex":
+            return self.regex_tokenize(text)
+        return word_tokenize(text)
 
-        return term_dict
+    def regex_tokenize(self, text):
+        """
+        A single pass regex tokenizer, emitting the tokens of nltk's Treebank word tokenizer
+        (word_tokenize without splitting the text into sentences first):
+        punctuation, quotes and contractions are split from the words, urls are split after the scheme
+        (https, :, //t.co/...), numbers keep their commas and hyphenated words stay whole.
+        :param text: text of a doc or a query
+        :return: list of tokens
+        """
+        if '"' in text:
+            text = self.open_quote_pattern.sub(r'\1 `` ', text).replace('"', " '' ")
+        tokens = self.token_pattern.findall(text)
+
+        if "'" in text:  # contractions, and quotes around words
+            tokens = [part for token in tokens
+                      for part in ([part for part in self.apostrophe_pattern.split(token) if part]
+                                   if "'" in token and token != "''" else (token,))]
+
+        # the period ending the text is split from its word
+        i = len(tokens) - 1
+        while i >= 0 and tokens[i] in self.closing_tokens:
+            i -= 1
+        if i >= 0 and len(tokens[i]) > 1 and tokens[i][-1] == '.' and tokens[i][-2] != '.':
+            tokens[i:i + 1] = [tokens[i][:-1], '.']
+
+        return tokens
 
     def check_ascii(self, token):
         return all((ord(char) > 32) and (ord(char) < 128) for char in token)
@@ -263,25 +385,58 @@ class Parse:
         :param query: string representation of the query
         :return: query object with corresponding fields.
         """
-        Parse.Parsing_a_word = True
-        query_tokenized = word_tokenize(query)
-        query_tokenized = [w for w in query_tokenized if w not in self.stop_words_dict]
-        query_dict = self.parse_sentence(query)
-
-        location_dict = self.location_dict
-        max_freq = self.max_freq_term
+        parser = self.query_parser()
+        phrases = tuple(parser.parse_phrase(match.group(1), match.group(2)) for match in
+                        parser.phrase_pattern.finditer(query))
+        query = parser.phrase_pattern.sub(r'\1', query)  # the words of a phrase are searched as any other word
+        query_tokens = parser.tokenize(query)
+        query_tokenized = [w for w in query_tokens if w not in parser.stop_words_dict]
+        query_dict = parser.parse_sentence(query, query_tokens)
+
+        location_dict = parser.location_dict
+        max_freq = parser.max_freq_term
         query_length = len(query_dict)
-        query = query_object(query_dict, query_length, max_freq, query_tokenized, location_dict)
-        self.max_freq_term = 0
-        self.term_dict = {}
-        self.location_dict = {}
+        query = query_object(query_dict, query_length, max_freq, query_tokenized, location_dict, phrases)
 
         return query
 
-    def parse_doc(self, doc_as_list):
+    def query_parser(self):
+        """
+        :return: a copy of the parser for parsing a single query. it shares the patterns, the stemmer and the
+        term cache of the parser, and holds its own state, leaving the statistics of the corpus untouched.
+        """
+        parser = copy.copy(self)
+        parser.Parsing_a_word = True
+        parser.max_freq_term = 0
+        parser.term_dict = {}
+        parser.tokens = None
+        parser.location_dict = {}
+        parser.lower_case_seen = None
+        return parser
+
+    def parse_phrase(self, text, window=None):
+        """
+        parses a phrase of a query, keeping the positions of its terms. entities are left out, since an entity
+        of the phrase may be a part of a longer entity in a doc - the words of the entity are kept.
+        :param text: the text of the phrase
+        :param window: the terms of the phrase are searched within a window of this many positions, in any order.
+        None - the terms are searched as an exact phrase
+        :return: (tuple of (term, position) pairs, window)
+        """
+        tokens = [w for w in self.tokenize(text) if w not in self.stop_words_dict]
+        terms = []
+        for term, position in self.parse_tokens(tokens):
+            if position is None:  # a number merged into a mixed number (25 3/4)
+                terms = [(other, other_position) for other, other_position in terms if other != term]
+            elif " " not in term:
+                terms.append((term, position))
+        return tuple(terms), int(window) if window is not None else None
+
+    def parse_doc(self, doc_as_list, url_terms=None):
         """
         This function takes a tweet document as list and break it into different fields
         :param doc_as_list: list re-preseting the tweet.
+        :param url_terms: the terms of the urls of the tweet, when they are extracted ahead (see UrlExtractor)
         :return: Document object with corresponding fields.
         """
         tweet_id = doc_as_list[0]
@@ -299,25 +454,20 @@ class Parse:
         retweet_quoted_urls = doc_as_list[12]
         retweet_quoted_indices = doc_as_list[13]
 
-        raw_urls = self.parse_raw_url(urls, retweet_urls, quote_urls, retweet_quoted_urls,
-                                      full_text)  # concatenate_tweets urls
-        broken_urls = self.parse_url_text(raw_urls)
+        if url_terms is None:
+            raw_urls = self.parse_raw_url(urls, retweet_urls, quote_urls, retweet_quoted_urls,
+                                          full_text)  # concatenate_tweets urls
+            url_terms = self.url_terms(self.parse_url_text(raw_urls))
 
-        for term in broken_urls:
-            # split the urls for the doc
-            if "http" not in term and term not in self.additional:
-                if term.isalpha():
-                    if term[0].isupper():
-                        term = term.upper()
-                    else:
-                        term = term.lower()
-                if term not in self.term_dict:
-                    self.term_dict[term] = 1
-                else:
-                    self.term_dict[term] += 1
+        for term in url_terms:
+            # the terms of the urls of the doc
+            if term not in self.term_dict:
+                self.term_dict[term] = 1
+            else:
+                self.term_dict[term] += 1
 
-                if self.term_dict[term] > self.max_freq_term:
-                    self.max_freq_term = self.term_dict[term]
+            if self.term_dict[term] > self.max_freq_term:
+                self.max_freq_term = self.term_dict[term]
 
         concatenated_text = self.concatenate_tweets(full_text, retweet_text, retweet_quoted_text,
                                                     quoted_text)  # concatenate_tweets text
@@ -375,13 +525,15 @@ class Parse:
         rest_of_token = ent[1:].upper()
         ent = ent[0] + rest_of_token
         if ent.isupper():
-            if ent not in Parse.CAPITAL_LETTER_DICT:
+            if ent not in Parse.CAPITAL_LETTER_DICT and not self.Parsing_a_word:
                 Parse.CAPITAL_LETTER_DICT[ent] = True
             return ent
 
         else:
             new_word = ent.upper()  # title
-            if new_word in Parse.CAPITAL_LETTER_DICT:
+            if self.lower_case_seen is not None:
+                self.lower_case_seen.add(new_word)
+            if new_word in Parse.CAPITAL_LETTER_DICT and not self.Parsing_a_word:
                 Parse.CAPITAL_LETTER_DICT[new_word] = False
 
             lower = ent.lower()
@@ -415,6 +567,23 @@ class Parse:
                     to_return.extend([address[1]])
         return to_return
 
+    def url_terms(self, broken_urls):
+        """
+        :param broken_urls: the parts of urls, as returned by parse_url_text
+        :return: list of the terms indexed for the parts
+        """
+        terms = []
+        for term in broken_urls:
+            # split the urls for the doc
+            if "http" not in term and term not in self.additional:
+                if term.isalpha():
+                    if term[0].isupper():
+                        term = term.upper()
+                    else:
+                        term = term.lower()
+                terms.append(term)
+        return terms
+
     def parse_numbers(self, number_as_str, word_before, word_after):
 
         """
@@ -522,9 +691,11 @@ class Parse:
         returnlist = [ret, division_as_is]
 
         if returnlist[1] != "":
-            Parse.AMOUNT_OF_NUMBERS_IN_CORPUS += 2
+            if not self.Parsing_a_word:
+                Parse.AMOUNT_OF_NUMBERS_IN_CORPUS += 2
             return returnlist
-        Parse.AMOUNT_OF_NUMBERS_IN_CORPUS += 1
+        if not self.Parsing_a_word:
+            Parse.AMOUNT_OF_NUMBERS_IN_CORPUS += 1
         return [ret]
 
     def parse_raw_url(self, url, retweet_url, quote_url, retweet_quoted_urls, full_text):
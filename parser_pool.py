@@ -0,0 +1,89 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from parser_module import Parse
+from term_cache import TermCache
+
+_worker_parser = None
+
+
+def _init_worker(stemmer, tokenizer, term_cache_size):
+    global _worker_parser
+    _worker_parser = Parse()
+    _worker_parser.STEMMER = stemmer
+    _worker_parser.TOKENIZER = tokenizer
+    if term_cache_size:
+        _worker_parser.term_cache = TermCache(term_cache_size)
+
+
+def _parse_batch(documents_list):
+    """
+    parses a batch of documents inside a worker process.
+    the corpus statistics are collected from scratch for every batch, so the main process
+    can merge them in the order of the batches.
+    :param documents_list: list of (document as list, terms of its urls - None to extract them) pairs
+    :return: parsed documents, capital letter dict, lower-case appearances, entity dict, amount of numbers
+    """
+    Parse.CAPITAL_LETTER_DICT = {}
+    Parse.ENTITY_DICT = {}
+    Parse.AMOUNT_OF_NUMBERS_IN_CORPUS = 0
+    _worker_parser.lower_case_seen = set()
+
+    parsed_documents = [_worker_parser.parse_doc(document, url_terms) for document, url_terms in documents_list]
+
+    return parsed_documents, Parse.CAPITAL_LETTER_DICT, _worker_parser.lower_case_seen, Parse.ENTITY_DICT, \
+        Parse.AMOUNT_OF_NUMBERS_IN_CORPUS
+
+
+def merge_corpus_stats(capital_letter_dict, lower_case_seen, entity_dict, amount_of_numbers):
+    """
+    merges the statistics of a single batch into the corpus-wide statistics of Parse.
+    batches must be merged in the order of the documents to get the same result as a serial parse:
+    a term that was seen in upper case before the batch becomes False once it is seen in lower case.
+    :return: -
+    """
+    for term in lower_case_seen:
+        if term in Parse.CAPITAL_LETTER_DICT:
+            Parse.CAPITAL_LETTER_DICT[term] = False
+    for term, value in capital_letter_dict.items():
+        if term not in Parse.CAPITAL_LETTER_DICT:
+            Parse.CAPITAL_LETTER_DICT[term] = value
+
+    for entity, count in entity_dict.items():
+        if entity not in Parse.ENTITY_DICT:
+            Parse.ENTITY_DICT[entity] = count
+        else:
+            Parse.ENTITY_DICT[entity] += count
+
+    Parse.AMOUNT_OF_NUMBERS_IN_CORPUS += amount_of_numbers
+
+
+class ParserPool:
+    """Parses documents on a pool of processes, returning them in their original order."""
+
+    def __init__(self, parser, processes, batch_size):
+        self._parser = parser
+        self.processes = processes
+        self.batch_size = batch_size
+
+    def parse(self, documents_list):
+        """
+        splits the documents into batches and parses them on the pool. at most two batches per process
+        are in flight, the next batch is read from documents_list as the oldest one is yielded.
+        :param documents_list: list (or iterable) of (document as list, terms of its urls - None to extract
+                               them in the workers) pairs, see UrlExtractor
+        :return: generator of parsed Document objects in the order of documents_list
+        """
+        documents = iter(documents_list)
+        batches = iter(lambda: list(islice(documents, self.batch_size)), [])
+        term_cache = self._parser.term_cache
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                 initargs=(self._parser.STEMMER, self._parser.TOKENIZER,
+                                           term_cache.max_entries if term_cache is not None else None)) as executor:
+            in_flight = deque(executor.submit(_parse_batch, batch) for batch in islice(batches, 2 * self.processes))
+            while in_flight:
+                parsed_documents, *corpus_stats = in_flight.popleft().result()
+                for batch in islice(batches, 1):
+                    in_flight.append(executor.submit(_parse_batch, batch))
+                merge_corpus_stats(*corpus_stats)
+                yield from parsed_documents
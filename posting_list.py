@@ -0,0 +1,184 @@
+from array import array
+import numpy as np
+import vbyte
+
+
+def term_weights(idf, normalized_tfs):
+    """
+    :param idf: idf of the term
+    :param normalized_tfs: normalized term frequencies (tf / max_tf) of the postings of the term
+    :return: numpy array (float32) of the tf-idf weights of the postings
+    """
+    normalized_tfs = np.asarray(normalized_tfs, dtype=np.float32).astype(np.float64)
+    return (idf * normalized_tfs).astype(np.float32)
+
+
+class PostingList:
+    """
+    The posting list of a single term, stored as parallel typed arrays:
+    int32 doc ids, uint16 term frequencies and float32 normalized term frequencies (tf / max_tf).
+    The float32 tf-idf weights (see term_weights) are set once the index is finalized.
+    In a positional index the positions of the term in every document are kept as well, one posting after
+    the other, with the amount of positions of every posting.
+    """
+
+    __slots__ = ('doc_ids', 'tfs', 'normalized_tfs', 'weights', 'position_counts', 'positions')
+
+    MAX_TF = 65535
+
+    def __init__(self, doc_ids=None, tfs=None, normalized_tfs=None, weights=None, position_counts=None,
+                 positions=None):
+        self.doc_ids = array('i') if doc_ids is None else doc_ids
+        self.tfs = array('H') if tfs is None else tfs
+        self.normalized_tfs = array('f') if normalized_tfs is None else normalized_tfs
+        self.weights = array('f') if weights is None else weights
+        self.position_counts = array('I') if position_counts is None else position_counts
+        self.positions = array('i') if positions is None else positions
+
+    def append(self, doc_id, tf, normalized_tf, positions=None):
+        """
+        :param positions: the sorted positions of the term in the document, None in a non positional index
+        """
+        self.doc_ids.append(doc_id)
+        self.tfs.append(min(tf, PostingList.MAX_TF))
+        self.normalized_tfs.append(normalized_tf)
+        if positions is not None:
+            self.position_counts.append(len(positions))
+            self.positions.extend(positions)
+
+    def extend(self, other):
+        self.doc_ids.extend(other.doc_ids)
+        self.tfs.extend(other.tfs)
+        self.normalized_tfs.extend(other.normalized_tfs)
+        self.position_counts.extend(other.position_counts)
+        self.positions.extend(other.positions)
+
+    @property
+    def positional(self):
+        return len(self.position_counts) == len(self.doc_ids)
+
+    def occurrences(self):
+        """
+        :return: numpy arrays of the doc id and the position of every occurrence of the term,
+        None if the positions are not kept
+        """
+        if not self.positional:
+            return None
+        return np.repeat(np.asarray(self.doc_ids, dtype=np.int64), np.asarray(self.position_counts, dtype=np.int64)), \
+            np.asarray(self.positions, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def __iter__(self):
+        """
+        :return: iterator of (doc id, tf, normalized tf) tuples
+        """
+        return zip(self.doc_ids.tolist(), self.tfs.tolist(), self.normalized_tfs.tolist())
+
+    def __getstate__(self):
+        return self.doc_ids, self.tfs, self.normalized_tfs, self.weights, self.position_counts, self.positions
+
+    def __setstate__(self, state):
+        self.doc_ids, self.tfs, self.normalized_tfs, self.weights, self.position_counts, self.positions = state
+
+
+class CompressedPostingList:
+    """
+    A posting list of a saved index, kept delta and variable-byte encoded in the mapped postings file.
+    Iterating it decodes one posting at a time; doc_ids, tfs and normalized_tfs decode the whole list
+    at once into numpy arrays. The normalized tf is computed from max_freq_term of the document.
+    Doc ids are stored relative to doc_base, the first doc id of the segment holding the list.
+    The tf-idf weights are not stored, they are computed from the normalized tfs and the idf of the term.
+    """
+
+    def __init__(self, buffer, offset, df, doc_ids_length, tfs_length, max_freq_terms, doc_base=0, idf=0.0):
+        self._buffer = buffer
+        self._offset = offset
+        self._df = df
+        self._doc_ids_length = doc_ids_length
+        self._tfs_length = tfs_length
+        self._max_freq_terms = max_freq_terms
+        self._doc_base = doc_base
+        self.idf = idf
+        self._local_doc_ids = None
+        self._tfs = None
+        self._weights = None
+
+    def __len__(self):
+        return self._df
+
+    def __iter__(self):
+        """
+        :return: generator of (doc id, tf, normalized tf) tuples
+        """
+        doc_ids = vbyte.decode_gaps(self._buffer, self._offset, self._doc_ids_length)
+        tfs = vbyte.decode(self._buffer, self._offset + self._doc_ids_length, self._tfs_length)
+        for doc_id, tf in zip(doc_ids, tfs):
+            yield doc_id + self._doc_base, tf, tf / int(self._max_freq_terms[doc_id])
+
+    def _decode_doc_ids(self):
+        if self._local_doc_ids is None:
+            self._local_doc_ids = vbyte.decode_gaps_array(self._buffer, self._offset, self._doc_ids_length)
+        return self._local_doc_ids
+
+    @property
+    def doc_ids(self):
+        return self._decode_doc_ids() + self._doc_base
+
+    @property
+    def tfs(self):
+        if self._tfs is None:
+            self._tfs = vbyte.decode_array(self._buffer, self._offset + self._doc_ids_length, self._tfs_length)
+        return self._tfs
+
+    @property
+    def normalized_tfs(self):
+        return self.tfs / self._max_freq_terms[self._decode_doc_ids()]
+
+    @property
+    def weights(self):
+        if self._weights is None:
+            self._weights = term_weights(self.idf, self.normalized_tfs)
+        return self._weights
+
+
+class ChainedPostingList:
+    """
+    The posting lists of a term in several segments of an index, viewed as one list.
+    Iterating it goes over the lists one after the other; the arrays are sorted by doc id.
+    """
+
+    def __init__(self, posting_lists):
+        self._posting_lists = posting_lists
+        self._order = None
+
+    def __len__(self):
+        return sum(len(posting_list) for posting_list in self._posting_lists)
+
+    def __iter__(self):
+        for posting_list in self._posting_lists:
+            yield from posting_list
+
+    def _concatenate(self, name):
+        if self._order is None:
+            doc_ids = np.concatenate([np.asarray(posting_list.doc_ids) for posting_list in self._posting_lists])
+            self._order = np.argsort(doc_ids, kind='stable')
+        values = np.concatenate([np.asarray(getattr(posting_list, name)) for posting_list in self._posting_lists])
+        return values[self._order]
+
+    @property
+    def doc_ids(self):
+        return self._concatenate('doc_ids')
+
+    @property
+    def tfs(self):
+        return self._concatenate('tfs')
+
+    @property
+    def normalized_tfs(self):
+        return self._concatenate('normalized_tfs')
+
+    @property
+    def weights(self):
+        return self._concatenate('weights')
@@ -0,0 +1,112 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    LRU cache of search results, bounded by the estimated size of its entries in bytes.
+    The entries are tagged with the version of the index they were computed on, and the whole
+    cache is dropped once it is used with another version.
+    The cache may be shared by threads searching at once, its operations hold a lock.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key to (result, size in bytes)
+        self._index_version = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query_object, k, model_name):
+        """
+        the terms are kept in the order of the query, since both the expansion (part of speech tagging)
+        and the query vector follow it. the phrases of the query are part of the key, as they restrict its docs.
+        :param query_object: the query, as returned by parse_query (before it is expanded)
+        :param k: number of results asked for
+        :param model_name: name of the model expanding the query
+        :return: the cache key of the query
+        """
+        return model_name, k, tuple(query_object.query_dict.items()), query_object.phrases
+
+    @staticmethod
+    def size_of(key, result):
+        """
+        :return: estimated memory held by an entry, in bytes
+        """
+        n_relevant, tweet_ids = result
+        size = sys.getsizeof(key) + sys.getsizeof(key[2]) + sys.getsizeof(tweet_ids)
+        size += sum(sys.getsizeof(term) for term, _ in key[2])
+        size += sum(sys.getsizeof(tweet_id) for tweet_id in tweet_ids)
+        return size
+
+    def _check_version(self, index_version):
+        if index_version != self._index_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.bytes = 0
+            self._index_version = index_version
+
+    def get(self, key, index_version):
+        """
+        :param key: the cache key of the query
+        :param index_version: version of the index searched
+        :return: (number of relevant docs, list of tweet ids), None if the query is not cached
+        """
+        with self._lock:
+            self._check_version(index_version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+        n_relevant, tweet_ids = entry[0]
+        return n_relevant, list(tweet_ids)
+
+    def put(self, key, result, index_version):
+        """
+        caches a result, evicting the least recently used entries while the cache is over its size.
+        :param key: the cache key of the query
+        :param result: (number of relevant docs, list of tweet ids)
+        :param index_version: version of the index searched
+        :return: -
+        """
+        n_relevant, tweet_ids = result
+        result = (n_relevant, list(tweet_ids))
+        size = QueryCache.size_of(key, result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._check_version(index_version)
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        :return: dictionary of the cache counters
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions, 'invalidations': self.invalidations, 'entries': len(self._entries),
+                'bytes': self.bytes}
@@ -0,0 +1,69 @@
+from concurrent.futures import ProcessPoolExecutor
+from searcher import Searcher
+
+_worker_dates = None
+_worker_norms = None
+
+
+def _init_worker(dates, norms):
+    global _worker_dates, _worker_norms
+    _worker_dates = dates
+    _worker_norms = norms
+
+
+def _rank_query(job):
+    """
+    ranks a single query inside a worker process.
+    :param job: (posting lists of the query terms, normalized query, k, doc filter)
+    :return: number of relevant docs, numpy array of the ranked doc ids
+    """
+    relevant_posting_lists, normalized_query, k, doc_filter = job
+    return Searcher(None, None).rank(relevant_posting_lists, normalized_query, _worker_dates, _worker_norms, k,
+                                     doc_filter)
+
+
+class QueryPool:
+    """
+    Ranks batches of queries on a pool of processes, returning the results in the order of the queries.
+    The processes are started by the first batch and kept for the next ones - they hold the document dates and
+    norms they were started with, and are started again once the index changes (the arrays are others).
+    """
+
+    def __init__(self, processes, chunk_size, min_queries):
+        """
+        :param processes: number of processes
+        :param chunk_size: amount of queries sent to a process at once
+        :param min_queries: smaller batches are ranked on the calling process, see Searcher.search_many
+        """
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.min_queries = min_queries
+        self._executor = None
+        self._arrays = None  # the dates and norms the processes were started with
+
+    def rank(self, jobs, dates, norms):
+        """
+        :param jobs: list of (posting lists of the query terms, normalized query, k, doc filter)
+        :param dates: numpy array of the document dates, indexed by doc id
+        :param norms: numpy array of the norms of the document vectors, indexed by doc id
+        :return: list of (number of relevant docs, numpy array of the ranked doc ids), one per job
+        """
+        if self._executor is None or self._arrays[0] is not dates or self._arrays[1] is not norms:
+            self.close()
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                                 initargs=(dates, norms))
+            self._arrays = dates, norms
+        return list(self._executor.map(_rank_query, jobs, chunksize=self.chunk_size))
+
+    def close(self):
+        """
+        stops the processes, if they are started.
+        :return: -
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._arrays = None
+
+    def __del__(self):
+        self.close()
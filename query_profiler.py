@@ -0,0 +1,180 @@
+import cProfile
+import heapq
+import io
+import os
+import pstats
+import threading
+import time
+from collections import deque
+import numpy as np
+
+STAGES = ('parse_query', 'query_expansion', 'posting_lookup', 'phrase_match', 'document_dict_init', 'ranker')
+
+
+class QueryTrace:
+    """
+    The wall time of the stages of a single search, and the amount of docs and postings it went through.
+    A stage is timed from the previous mark (or the start of the search) to its own mark.
+    """
+    __slots__ = ('query', 'stages', 'total', 'candidates', 'postings', 'cached', 'profile', '_start', '_last')
+
+    def __init__(self, query, profile=False):
+        """
+        :param query: the query, as given to the search
+        :param profile: run the search under cProfile
+        """
+        self.query = query
+        self.stages = {}
+        self.total = 0.0
+        self.candidates = self.postings = 0
+        self.cached = False
+        self.profile = cProfile.Profile() if profile else None
+        if self.profile is not None:
+            self.profile.enable()
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, stage):
+        """
+        ends a stage of the search.
+        :param stage: name of the stage, one of STAGES
+        :return: -
+        """
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def finish(self, candidates=0, postings=0, cached=False):
+        """
+        :param candidates: number of docs holding a query term
+        :param postings: number of postings of the query terms which were scanned
+        :param cached: the result was found in the query cache
+        :return: -
+        """
+        self.close()
+        self.total = time.perf_counter() - self._start
+        self.candidates, self.postings = candidates, postings
+        self.cached = cached
+
+    def close(self):
+        """
+        stops the cProfile profile of the search, if it is profiled. called by finish, and when the search fails.
+        :return: -
+        """
+        if self.profile is not None:
+            self.profile.disable()
+
+    def as_dict(self):
+        """
+        :return: dictionary of the trace, the times in ms
+        """
+        return {'query': self.query, 'total_ms': self.total * 1000,
+                'stages_ms': {stage: seconds * 1000 for stage, seconds in self.stages.items()},
+                'candidates': self.candidates, 'postings': self.postings, 'cached': self.cached}
+
+
+class QueryProfiler:
+    """
+    Collects the traces of the searches (see Searcher.parse_query), the recent ones are kept.
+    With slowest > 0 every search is run under cProfile, and the profiles of the slowest searches are kept
+    to be dumped. The profiler may be shared by threads searching at once, recording holds a lock.
+    """
+
+    def __init__(self, max_traces=10000, slowest=0):
+        """
+        :param max_traces: number of recent traces kept
+        :param slowest: number of the slowest searches whose cProfile profiles are kept, 0 - no cProfile
+        """
+        self.slowest = slowest
+        self._traces = deque(maxlen=max_traces)
+        self._slowest = []  # heap of (total time, sequence number, trace)
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def start(self, query):
+        """
+        :param query: the query searched
+        :return: QueryTrace of the search
+        """
+        return QueryTrace(query, profile=self.slowest > 0)
+
+    def record(self, trace):
+        """
+        keeps a finished trace, and its profile if it is one of the slowest searches.
+        :param trace: QueryTrace
+        :return: -
+        """
+        with self._lock:
+            self._traces.append(trace)
+            if trace.profile is None or trace.cached:
+                return
+            self._sequence += 1
+            entry = (trace.total, self._sequence, trace)
+            if len(self._slowest) < self.slowest:
+                heapq.heappush(self._slowest, entry)
+            elif entry[0] > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def traces(self):
+        """
+        :return: list of the recent traces, as dictionaries
+        """
+        with self._lock:
+            return [trace.as_dict() for trace in self._traces]
+
+    def slowest_traces(self):
+        """
+        :return: list of the profiled traces of the slowest searches, slowest first
+        """
+        with self._lock:
+            return [trace for _, _, trace in sorted(self._slowest, reverse=True)]
+
+    def summary(self):
+        """
+        :return: dictionary of the number of traces, and the mean / p50 / p95 / p99 (ms) of the total time and of
+        every stage, and the mean number of candidates and postings, over the searches not found in the cache
+        """
+        with self._lock:
+            traces = [trace for trace in self._traces if not trace.cached]
+            cached = len(self._traces) - len(traces)
+        summary = {'searches': len(traces), 'cached': cached}
+        if not traces:
+            return summary
+
+        timings = {'total': np.array([trace.total for trace in traces]) * 1000}
+        for stage in STAGES:
+            stage_timings = [trace.stages[stage] for trace in traces if stage in trace.stages]
+            if stage_timings:
+                timings[stage] = np.array(stage_timings) * 1000
+        for name, values in timings.items():
+            summary[name + '_ms'] = {'mean': float(values.mean()), 'p50': float(np.percentile(values, 50)),
+                                     'p95': float(np.percentile(values, 95)), 'p99': float(np.percentile(values, 99))}
+        for counter in ('candidates', 'postings'):
+            summary['mean_' + counter] = float(np.mean([getattr(trace, counter) for trace in traces]))
+        return summary
+
+    def dump(self, dest_dir, top=30):
+        """
+        writes the profiles of the slowest searches - a pstats file per search (slowest_<rank>.prof) and
+        slowest.txt, the trace and the top functions by cumulative time of every search.
+        :param dest_dir: directory the profiles are written to
+        :param top: number of functions listed per search in slowest.txt
+        :return: list of the written pstats files
+        """
+        os.makedirs(dest_dir, exist_ok=True)
+        written = []
+        with open(os.path.join(dest_dir, 'slowest.txt'), 'w') as report:
+            for rank, trace in enumerate(self.slowest_traces(), 1):
+                fn = os.path.join(dest_dir, 'slowest_{}.prof'.format(rank))
+                trace.profile.dump_stats(fn)
+                written.append(fn)
+
+                stats_text = io.StringIO()
+                pstats.Stats(trace.profile, stream=stats_text).sort_stats('cumulative').print_stats(top)
+                report.write('#{} {!r} {:.2f} ms {}\n'.format(rank, trace.query, trace.total * 1000, trace.as_dict()))
+                report.write(stats_text.getvalue() + '\n')
+        return written
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+            self._slowest = []
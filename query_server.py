@@ -0,0 +1,231 @@
+import argparse
+import asyncio
+import importlib
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+from configuration import ConfigClass
+
+LATENCY_WINDOW = 10000  # amount of recent requests the latency percentiles are computed over
+
+_worker_engine = None
+
+
+def load_engine(engine_module, index_fn, model_dir, config):
+    """
+    :param engine_module: name of the search engine module (search_engine_best...)
+    :param index_fn: file name of the saved index
+    :param model_dir: directory of the precomputed model, None - no model
+    :param config: ConfigClass of the engine
+    :return: SearchEngine with the index and the model loaded
+    """
+    engine = importlib.import_module(engine_module).SearchEngine(config)
+    engine.load_index(index_fn)
+    engine.load_precomputed_model(model_dir)
+    return engine
+
+
+def _init_worker(engine_module, index_fn, model_dir, config):
+    global _worker_engine
+    _worker_engine = load_engine(engine_module, index_fn, model_dir, config)
+
+
+def _worker_ready(_):
+    return _worker_engine is not None
+
+
+def _search(query):
+    """
+    searches a query inside a worker process.
+    :return: number of relevant docs, list of tweet ids
+    """
+    return _worker_engine.search(query)
+
+
+class QueryServer:
+    """
+    A local HTTP service answering queries from an index loaded once.
+    GET /search?q=<query> returns the results with the latency of the request and the amount of searches
+    in flight when it arrived. Identical queries in flight are searched once, the requests wait for the same
+    search. The searches run on a pool of threads sharing the engine (queries are parsed and searched
+    re-entrantly), or on a pool of processes loading the index each (the mapped index files are shared).
+    GET /stats returns the counters of the server and the latency percentiles of the recent requests.
+    """
+
+    def __init__(self, engine_module, index_fn="inverted_idx.pkl", model_dir=None, config=None):
+        """
+        :param engine_module: name of the search engine module (search_engine_best...)
+        :param index_fn: file name of the saved index
+        :param model_dir: directory of the precomputed model, None - no model
+        :param config: ConfigClass of the engine, its server* attributes configure the server
+        """
+        self.config = config if config is not None else ConfigClass()
+        self.port = self.config.serverPort
+        if self.config.serverProcesses:
+            self._engine = None
+            self._executor = ProcessPoolExecutor(max_workers=self.config.serverWorkers, initializer=_init_worker,
+                                                 initargs=(engine_module, index_fn, model_dir, self.config))
+            # the workers are started (and load the index) before any connection is accepted,
+            # forked later they would hold the socket of the request starting them open
+            list(self._executor.map(_worker_ready, range(self.config.serverWorkers)))
+        else:
+            self._engine = load_engine(engine_module, index_fn, model_dir, self.config)
+            self._executor = ThreadPoolExecutor(max_workers=self.config.serverWorkers)
+        self._in_flight = {}  # query to the future of its search
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.searches = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+
+    def _run_search(self, query):
+        """
+        :return: future of the search of a query on the pool
+        """
+        loop = asyncio.get_running_loop()
+        if self._engine is None:
+            return loop.run_in_executor(self._executor, _search, query)
+        return loop.run_in_executor(self._executor, self._engine.search, query)
+
+    async def search(self, query):
+        """
+        :param query: the query, as given in the request
+        :return: dictionary of the response - the results, latency of the request in ms, amount of searches
+        in flight when the request arrived (queue depth), and whether it waited for a search of another request
+        """
+        start = time.perf_counter()
+        self.requests += 1
+        key = " ".join(query.split())
+        queue_depth = len(self._in_flight)
+        future = self._in_flight.get(key)
+        coalesced = future is not None
+        if coalesced:
+            self.coalesced += 1
+        else:
+            self.searches += 1
+            future = self._run_search(query)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            self.max_queue_depth = max(self.max_queue_depth, len(self._in_flight))
+
+        n_relevant, tweet_ids = await asyncio.shield(future)
+        latency = (time.perf_counter() - start) * 1000
+        self._latencies.append(latency)
+        return {'query': query, 'n_relevant': int(n_relevant), 'tweet_ids': [str(tweet_id) for tweet_id in tweet_ids],
+                'latency_ms': latency, 'queue_depth': queue_depth, 'coalesced': coalesced}
+
+    def stats(self):
+        """
+        :return: dictionary of the server counters, and the latency percentiles (ms) of the recent requests
+        """
+        stats = {'requests': self.requests, 'searches': self.searches, 'coalesced': self.coalesced,
+                 'errors': self.errors, 'queue_depth': len(self._in_flight), 'max_queue_depth': self.max_queue_depth}
+        if self._latencies:
+            latencies = np.fromiter(self._latencies, dtype=np.float64)
+            for percentile in (50, 95, 99):
+                stats['latency_p{}_ms'.format(percentile)] = float(np.percentile(latencies, percentile))
+        if self._engine is not None:
+            stats['query_cache'] = self._engine.query_cache_stats()
+        return stats
+
+    async def respond(self, path):
+        """
+        :param path: path of a GET request, with its query string
+        :return: HTTP status, and the response as a dictionary
+        """
+        url = urlsplit(path)
+        if url.path == '/search':
+            queries = parse_qs(url.query).get('q')
+            if not queries or not queries[0].strip():
+                return 400, {'error': 'missing query, use /search?q=<query>'}
+            try:
+                return 200, await self.search(queries[0])
+            except Exception as e:
+                self.errors += 1
+                return 500, {'error': repr(e)}
+        if url.path == '/stats':
+            return 200, self.stats()
+        return 404, {'error': 'unknown path {}'.format(url.path)}
+
+    async def handle(self, reader, writer):
+        """
+        serves the requests of a connection, kept alive until the client closes it (or asks to).
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip().lower()
+
+                method, path, version = (request_line.decode('latin-1').split() + ['', '', ''])[:3]
+                if method != 'GET':
+                    status, response = 405, {'error': 'only GET requests are served'}
+                else:
+                    status, response = await self.respond(path)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection') != 'close'
+
+                body = json.dumps(response).encode('utf-8')
+                writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+                             'Connection: {}\r\n\r\n'.format(status, 'OK' if status == 200 else 'Error', len(body),
+                                                             'keep-alive' if keep_alive else 'close').encode('latin-1'))
+                writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, ready=None):
+        """
+        serves on localhost until cancelled.
+        :param ready: asyncio.Event set once the server listens
+        """
+        server = await asyncio.start_server(self.handle, '127.0.0.1', self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        print('Serving on http://127.0.0.1:{}/search?q=<query>'.format(self.port))
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self._executor.shutdown()
+        if self._engine is not None:
+            self._engine.close()
+
+
+def main():
+    arguments = argparse.ArgumentParser(description='local query server')
+    arguments.add_argument('--engine', default='search_engine_best', help='search engine module')
+    arguments.add_argument('--index', default='inverted_idx.pkl', help='file name of the saved index')
+    arguments.add_argument('--model-dir', default=None, help='directory of the precomputed model')
+    arguments.add_argument('--port', type=int, default=None, help='port to listen on, default config.serverPort')
+    arguments = arguments.parse_args()
+
+    config = ConfigClass()
+    if arguments.port is not None:
+        config.serverPort = arguments.port
+    server = QueryServer(arguments.engine, arguments.index, arguments.model_dir, config)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,38 +1,45 @@
 # you can change whatever you want in this module, just make sure it doesn't 
 # break the searcher module
-from numpy import dot
+import time
+import numpy as np
 from numpy.linalg import norm
 class Ranker:
     def __init__(self):
         pass
 
     @staticmethod
-    def rank_relevant_docs(relevant_docs, normalized_query, inverted_documents_dict, k=None):
+    def rank_relevant_docs(doc_ids, doc_products, normalized_query, doc_norms, dates, k=None, query_time=None):
         """
-        calculates cosine similarity over doc-query pair ranked by tf-idf.
-        then, sorts by highest doc score and returns k most relevant docs.
-        :param relevant_docs:
+        calculates cosine similarity over doc-query pair ranked by tf-idf, for all the docs at once -
+        the dot product of every doc and the query, divided by the norm of the doc vector (saved in the index)
+        and the norm of the query.
+        then, selects the k most relevant docs by highest score, the more recent doc first on equal scores.
+        :param doc_ids: numpy array of the relevant doc ids
+        :param doc_products: numpy array of the dot products of the relevant docs and the query
         :param normalized_query:
-        :param inverted_documents_dict:
+        :param doc_norms: numpy array of the norms of the document vectors, indexed by doc id
+        :param dates: numpy array of the document dates (seconds since the epoch), indexed by doc id
         :param k:
-        :return:
+        :param query_time: time of the query in seconds since the epoch, default to now.
+        the age of the docs is taken relative to it.
+        :return: numpy array of doc ids
         """
-        ranked_docs_dict = {}
+        if len(doc_ids) == 0:
+            return doc_ids
 
-        for doc in relevant_docs:
-            cos_sim = dot(relevant_docs[doc], normalized_query) / (norm(relevant_docs[doc]) * norm(normalized_query))
-            ranked_docs_dict[doc] = cos_sim
+        normalized_query = np.asarray(normalized_query, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = doc_products / (doc_norms[doc_ids] * norm(normalized_query))
+        scores = np.nan_to_num(scores, nan=0.0)
+        if query_time is None:
+            query_time = int(time.time())
+        doc_ages = query_time - dates[doc_ids]
 
-        sorted_ranked_docs_dict = {k: v for k, v in
-                                   sorted(ranked_docs_dict.items(), key=lambda item: (item[1],
-                                                                                      1 / inverted_documents_dict[
-                                                                                      str(item[0])][1]), reverse=True)}
-        docs_to_retrieve = []
-        for idx, (key, value) in enumerate(sorted_ranked_docs_dict.items()):
-            if k is not None and idx == k:
-                break
-
-            docs_to_retrieve.append(key)
-
-        return docs_to_retrieve
+        candidates = np.arange(len(doc_ids))
+        if k is not None and k < len(doc_ids):
+            # only the docs scoring at least the k-th best score can be retrieved
+            kth_score = np.partition(scores, len(scores) - k)[len(scores) - k]
+            candidates = np.flatnonzero(scores >= kth_score)
 
+        order = np.lexsort((doc_ages[candidates], -scores[candidates]))[:k]
+        return doc_ids[candidates[order]]
@@ -1,5 +1,20 @@
 import os
 import pandas as pd
+import pyarrow.parquet as pq
+
+TWEET_DATE_FORMAT = '%a %b %d %H:%M:%S +0000 %Y'
+# positions of the columns of the corpus used by Parse.parse_doc - the *_indices columns are not read
+PARSED_COLUMNS = (0, 1, 2, 3, 5, 6, 8, 9, 11, 12)
+
+
+def tweet_timestamps(tweet_dates):
+    """
+    converts the dates of the tweets all at once.
+    :param tweet_dates: pandas Series of tweet dates as strings, example --> 'Wed Jul 08 19:30:15 +0000 2020'
+    :return: numpy array (int64) of the dates in seconds since the epoch (UTC)
+    """
+    dates = pd.to_datetime(tweet_dates, format=TWEET_DATE_FORMAT, utc=True)
+    return ((dates - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).to_numpy(dtype='int64')
 
 
 class ReadFile:
@@ -12,13 +27,51 @@ class ReadFile:
         The file location is given as a string as an input to this function.
         :param read_corpus:
         :param file_name: string - indicates the path to the file we wish to read.
-        :return: a dataframe contains tweets.
+        :return: a dataframe contains tweets. the dates of the tweets are given in seconds since the epoch.
         """
         full_path = os.path.join(self.corpus_path, file_name)
 
         df = pd.read_parquet(full_path, engine="pyarrow")
+        if 'tweet_date' in df.columns:
+            df['tweet_date'] = tweet_timestamps(df['tweet_date'])
+        # missing values are None, as the parser expects (string columns may read them as NaN)
+        df = df.astype(object).where(df.notna(), None)
         return df.values.tolist()
 
+    def count_documents(self, file_name):
+        """
+        :param file_name: string - indicates the path to the file
+        :return: number of tweets in the file, from the parquet metadata
+        """
+        return pq.ParquetFile(os.path.join(self.corpus_path, file_name)).metadata.num_rows
+
+    def iter_file(self, file_name, batch_size):
+        """
+        Reads a parquet file one record batch at a time, only the columns used by the parser.
+        The documents keep the layout of read_file, with None in the columns which are not read.
+        :param file_name: string - indicates the path to the file we wish to read.
+        :param batch_size: number of tweets read at once
+        :return: generator of documents as lists. the dates of the tweets are given in seconds since the epoch.
+        """
+        parquet_file = pq.ParquetFile(os.path.join(self.corpus_path, file_name))
+        names = parquet_file.schema_arrow.names
+        positions = [position for position in PARSED_COLUMNS if position < len(names)]
+        columns = [names[position] for position in positions]
+
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            values = []
+            for name in columns:
+                if name == 'tweet_date':
+                    values.append(tweet_timestamps(batch.column(name).to_pandas()).tolist())
+                else:
+                    values.append(batch.column(name).to_pylist())
+
+            for row_values in zip(*values):
+                document = [None] * len(names)
+                for position, value in zip(positions, row_values):
+                    document[position] = value
+                yield document
+
     def read_corpus(self):
         corpus_list = [os.path.join("data", x)
                        for d, dirs, files in os.walk("data")
@@ -0,0 +1,256 @@
+import pandas as pd
+from reader import ReadFile
+from parser_module import Parse
+from parser_pool import ParserPool
+from indexer import Indexer
+from query_cache import QueryCache
+from query_profiler import QueryProfiler
+from term_cache import TermCache
+from url_extractor import UrlExtractor
+from query_pool import QueryPool
+from searcher import Searcher
+
+
+class SearchEngineBase:
+    """
+    The parts of the search engines which don't depend on their model - building and loading the index,
+    searching it through the query cache and the profiler. An engine (search_engine_*.SearchEngine) sets
+    its model after this __init__, and the number of results it returns in K.
+    """
+    K = 1500  # number of results returned per query
+
+    def __init__(self, config=None):
+        """
+        init engine without a model, see SearchEngine of the search_engine_* modules
+        :param config:
+        """
+        self._config = config
+        try:
+            self._reader = ReadFile(corpus_path=config.get__corpusPath())
+        except:
+            self._reader = ReadFile("")
+        self._parser = Parse()
+        self._parser.STEMMER = config.toStem
+        self._parser.TOKENIZER = config.tokenizer
+        if config.termCacheSize:
+            self._parser.term_cache = TermCache(config.termCacheSize)
+        self._indexer = Indexer(config)
+        self._parser_pool = None
+        if config.parserProcesses > 1:
+            self._parser_pool = ParserPool(self._parser, config.parserProcesses, config.parserBatchSize)
+        self._url_extractor = None
+        if config.urlCacheSize:
+            self._url_extractor = UrlExtractor(self._parser, config.urlCacheSize,
+                                               config.readerBatchSize or config.parserBatchSize)
+        self._model = None
+        self._query_cache = None
+        if config.queryCacheBudget:
+            self._query_cache = QueryCache(config.queryCacheBudget * 1024 * 1024)
+        self._query_pool = None
+        if config.searchProcesses > 1:
+            self._query_pool = QueryPool(config.searchProcesses, config.searchChunkSize, config.searchMinQueries)
+        self._profiler = None
+        if config.queryProfiling:
+            self._profiler = QueryProfiler(slowest=config.profileSlowestQueries)
+        self.last_parquet = False
+
+    # DO NOT MODIFY THIS SIGNATURE
+    # You can change the internal implementation as you see fit.
+    def build_index_from_parquet(self, fn):
+        """
+        Reads parquet file and passes it to the parser, then indexer.
+        Input:
+            fn - path to parquet file
+        Output:
+            No output, just modifies the internal _indexer object.
+        """
+        if self._config.readerBatchSize:
+            documents_list = self._reader.iter_file(fn, self._config.readerBatchSize)
+            total_documents = self._reader.count_documents(fn)
+        else:
+            documents_list = self._reader.read_file(fn)
+            total_documents = len(documents_list)
+        if self._url_extractor is not None:
+            documents_list = self._url_extractor.extract(documents_list)
+        else:
+            documents_list = ((document, None) for document in documents_list)
+        if self._parser_pool is not None:
+            parsed_documents = self._parser_pool.parse(documents_list)
+        else:
+            parsed_documents = (self._parser.parse_doc(document, url_terms) for document, url_terms in documents_list)
+
+        # Iterate over every document in the file
+        number_of_documents = 0
+        for idx, parsed_document in enumerate(parsed_documents):
+            number_of_documents += 1
+            # index the document data
+            if self.last_parquet and idx == total_documents - 1:
+                self._indexer.last_doc = True
+            self._indexer.add_new_doc(parsed_document)
+        print('Finished parsing and indexing.')
+
+    def build_index_from_corpus(self):
+        """
+        Reads every parquet file in the corpus and passes it to the parser, then indexer.
+        The index is finalized once the last file is indexed.
+        """
+        corpus_files = self._reader.read_corpus()
+        for idx, fn in enumerate(corpus_files):
+            self.last_parquet = idx == len(corpus_files) - 1
+            self.build_index_from_parquet(fn)
+
+    def add_parquet_to_index(self, fn, index_fn="inverted_idx.pkl"):
+        """
+        Appends the documents of a parquet file to a saved index as a new segment.
+        Only the new documents are parsed and indexed, queries then search all the segments.
+        Input:
+            fn - path to parquet file
+            index_fn - file name of the saved index
+        """
+        self._indexer.open_segment(index_fn)
+        self.last_parquet = True
+        self.build_index_from_parquet(fn)
+
+    # DO NOT MODIFY THIS SIGNATURE
+    # You can change the internal implementation as you see fit.
+    def load_index(self, fn):
+        """
+        Loads a pre-computed index (or indices) so we can answer queries.
+        Input:
+            fn - file name of pickled index.
+        """
+        self._indexer.load_index(fn)
+        if self._config.queryCacheWarmupFile:
+            self.warm_query_cache(self._config.queryCacheWarmupFile)
+
+    # DO NOT MODIFY THIS SIGNATURE
+    # You can change the internal implementation as you see fit.
+    def load_precomputed_model(self, model_dir=None):
+        """
+        Loads a pre-computed model (or models) so we can answer queries.
+        This is where you would load models like word2vec, LSI, LDA, etc. and
+        assign to self._model, which is passed on to the searcher at query time.
+        """
+        pass
+
+    # DO NOT MODIFY THIS SIGNATURE
+    # You can change the internal implementation as you see fit.
+    def search(self, query):
+        """
+        Executes a query over an existing index and returns the number of
+        relevant docs and an ordered list of search results.
+        Input:
+            query - string.
+        Output:
+            A tuple containing the number of relevant search results, and
+            a list of tweet_ids where the first element is the most relavant
+            and the last is the least relevant result.
+        """
+        searcher = Searcher(self._parser, self._indexer, model=self._model)
+        searcher.profiler = self._profiler
+        if self._query_cache is None:
+            return searcher.search(query, self.K)
+
+        try:
+            query_object = searcher.parse_query(query)
+            key = QueryCache.key(query_object, self.K, type(self._model).__name__)
+            result = self._query_cache.get(key, self._indexer.index_version())
+            if result is None:
+                result = searcher.search_query(query_object, self.K)
+                self._query_cache.put(key, result, self._indexer.index_version())
+            else:
+                searcher.end_trace(cached=True)
+            return result
+        finally:
+            searcher.discard_trace()  # a search which raised, its profile is stopped
+
+    def search_many(self, queries, k=None):
+        """
+        Executes a batch of queries, see search. The posting list of every term is fetched once for the
+        whole batch, and the queries are ranked on config.searchProcesses processes.
+        Input:
+            queries - list of strings.
+            k - number of top results to return per query, K by default.
+        Output:
+            A list of tuples, one per query, as returned by search.
+        """
+        if k is None:
+            k = self.K
+        searcher = Searcher(self._parser, self._indexer, model=self._model)
+        query_objects = [self._parser.parse_query(query) for query in queries]
+        keys = [QueryCache.key(query_object, k, type(self._model).__name__) for query_object in query_objects]
+        index_version = self._indexer.index_version()
+        if self._query_cache is not None:
+            results = [self._query_cache.get(key, index_version) for key in keys]
+        else:
+            results = [None] * len(queries)
+
+        # repeated queries are searched once
+        first_query = {}
+        for i, result in enumerate(results):
+            if result is None and keys[i] not in first_query:
+                first_query[keys[i]] = i
+        searched = searcher.search_many([query_objects[i] for i in first_query.values()], k, self._query_pool)
+        searched = dict(zip(first_query, searched))
+        for key, result in searched.items():
+            if self._query_cache is not None:
+                self._query_cache.put(key, result, index_version)
+
+        for i, key in enumerate(keys):
+            if results[i] is None:
+                n_relevant, tweet_ids = searched[key]
+                results[i] = (n_relevant, list(tweet_ids))
+        return results
+
+    def close(self):
+        """
+        Stops the processes ranking the queries of search_many, if they are started.
+        """
+        if self._query_pool is not None:
+            self._query_pool.close()
+
+    def __del__(self):
+        if hasattr(self, '_query_pool'):  # not set if __init__ raised
+            self.close()
+
+    def warm_query_cache(self, queries_fn):
+        """
+        Runs the queries of a query log, so their results are cached.
+        Input:
+            queries_fn - tsv file with a 'keywords' column, such as data/queries_train.tsv
+        """
+        if self._query_cache is None:
+            return
+        for query in pd.read_csv(queries_fn, sep='\t')['keywords']:
+            self.search(query)
+
+    def query_cache_stats(self):
+        """
+        Output:
+            dictionary of the query cache counters (hits, misses, evictions...), None without a cache
+        """
+        return self._query_cache.stats() if self._query_cache is not None else None
+
+    def query_profile_stats(self):
+        """
+        Output:
+            dictionary of the timings of the search stages (mean, p50, p95, p99 in ms) and the mean amount of
+            candidate docs and postings of the traced searches, None when the searches are not traced
+        """
+        return self._profiler.summary() if self._profiler is not None else None
+
+    def dump_query_profiles(self, dest_dir):
+        """
+        Writes the cProfile profiles of the slowest searches (config.profileSlowestQueries) to dest_dir.
+        Output:
+            list of the written pstats files
+        """
+        return self._profiler.dump(dest_dir) if self._profiler is not None else []
+
+    def term_cache_stats(self):
+        """
+        Output:
+            dictionary of the parser's term cache counters (hits, misses, evictions...), None without a cache.
+            documents parsed on a ParserPool are counted by the caches of the worker processes.
+        """
+        return self._parser.term_cache.stats() if self._parser.term_cache is not None else None
@@ -1,8 +1,7 @@
-import copy
-import math
+import threading
 import nltk
-from spellchecker import SpellChecker
-from nltk import pos_tag
+import numpy as np
+from posting_list import PostingList
 from ranker import Ranker
 from nltk.corpus import lin_thesaurus as thesaurus
 from nltk.corpus import wordnet
@@ -20,8 +19,12 @@ class Searcher:
         self._indexer = indexer
         self._ranker = Ranker()
         self._model = model
-        self._docs_dict = {}
-        self.number_of_documents = len(indexer.docs_dict)
+        self._doc_ids = np.zeros(0, dtype=np.int64)
+        self._doc_products = np.zeros(0)
+        self.n_relevant = 0
+        self.postings = 0  # postings of the query terms
+        self.profiler = None  # QueryProfiler the searches are traced by, None - not traced
+        self._trace = None  # QueryTrace of the search running
 
     # DO NOT MODIFY THIS SIGNATURE
     # You can change the internal implementation as you see fit.
@@ -37,29 +40,130 @@ class Searcher:
             a list of tweet_ids where the first element is the most relavant
             and the last is the least relevant result.
         """
+        try:
+            return self.search_query(self.parse_query(query), k)
+        finally:
+            self.discard_trace()
+
+    def parse_query(self, query):
+        """
+        parses a query. with a profiler, the trace of the search starts here - its stages are marked
+        as the search goes on, and it is recorded once the search ends (see search_query and end_trace).
+        :param query: string
+        :return: the query, as returned by the parser
+        """
+        if self.profiler is not None:
+            self._trace = self.profiler.start(query)
         query_object = self._parser.parse_query(query)
+        if self._trace is not None:
+            self._trace.mark('parse_query')
+        return query_object
+
+    def end_trace(self, cached=False):
+        """
+        records the trace of the search running, if it is traced.
+        :param cached: the result of the search was found in the query cache
+        :return: -
+        """
+        if self._trace is None:
+            return
+        if cached:
+            self._trace.finish(cached=True)
+        else:
+            self._trace.finish(self.n_relevant, self.postings)
+        self.profiler.record(self._trace)
+        self._trace = None
+
+    def discard_trace(self):
+        """
+        drops the trace of a search which did not end (it raised), stopping its profile.
+        :return: -
+        """
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
 
-        relevant_docs = self._relevant_docs_from_posting(query_object)
+    def search_query(self, query_object, k=None):
+        """
+        Executes a query which is already parsed, see search.
+        :param query_object: the query, as returned by parse_query
+        :param k: number of top results to return, default to everything.
+        :return: number of relevant search results, and a list of tweet_ids.
+        """
+        relevant_posting_lists = self._relevant_docs_from_posting(query_object)
         normalized_query = self.normalized_query(query_object)
-        n_relevant = len(relevant_docs)
-        ranked_doc_ids = Ranker.rank_relevant_docs(relevant_docs, normalized_query, self._indexer.docs_dict, k)
-        return n_relevant, ranked_doc_ids
+        doc_filter = self.phrase_docs(query_object.phrases)
+        if self._trace is not None:
+            self._trace.mark('phrase_match')
+        n_relevant, ranked_doc_ids = self.rank(relevant_posting_lists, normalized_query, self._indexer.document_dates(),
+                                               self._indexer.document_norms(), k, doc_filter)
+        tweet_ids = [self._indexer.tweet_id(doc_id) for doc_id in ranked_doc_ids]
+        self.end_trace()
+        return n_relevant, tweet_ids
+
+    def search_many(self, query_objects, k=None, query_pool=None):
+        """
+        Executes a batch of parsed queries. The posting list of every term is fetched and
+        gathered into arrays once for the whole batch, then the queries are scored one by one,
+        or on the processes of query_pool (batches of at least query_pool.min_queries queries).
+        :param query_objects: the queries, as returned by parse_query
+        :param k: number of top results to return per query, default to everything.
+        :param query_pool: QueryPool scoring the queries, None scores them on this process
+        :return: list of (number of relevant search results, list of tweet_ids), one per query
+        """
+        posting_lists = {}
+        jobs = []
+        for query_object in query_objects:
+            relevant_posting_lists = self._relevant_docs_from_posting(query_object, posting_lists)
+            jobs.append((relevant_posting_lists, self.normalized_query(query_object), k,
+                         self.phrase_docs(query_object.phrases)))
+
+        dates, norms = self._indexer.document_dates(), self._indexer.document_norms()
+        if query_pool is not None and len(jobs) >= query_pool.min_queries:
+            ranked = query_pool.rank(jobs, dates, norms)
+        else:
+            ranked = [self.rank(relevant_posting_lists, normalized_query, dates, norms, k, doc_filter)
+                      for relevant_posting_lists, normalized_query, k, doc_filter in jobs]
 
-    # feel free to change the signature and/or implementation of this function
-    # or drop altogether.
-    def _relevant_docs_from_posting(self, query_object):
+        return [(n_relevant, [self._indexer.tweet_id(doc_id) for doc_id in ranked_doc_ids])
+                for n_relevant, ranked_doc_ids in ranked]
+
+    def rank(self, relevant_posting_lists, normalized_query, dates, norms, k=None, doc_filter=None):
+        """
+        scores the docs of the query terms and ranks them.
+        :param relevant_posting_lists: dictionary mapping a query term to its posting list
+        :param normalized_query:
+        :param dates: numpy array of the document dates, indexed by doc id
+        :param norms: numpy array of the norms of the document vectors, indexed by doc id
+        :param k: number of top results to return, default to everything.
+        :param doc_filter: sorted numpy array of the only docs which may be returned (see phrase_docs), None - any doc
+        :return: number of relevant docs, and numpy array of the ranked doc ids
+        """
+        self.document_dict_init(relevant_posting_lists, normalized_query, norms, doc_filter)
+        if self._trace is not None:
+            self._trace.mark('document_dict_init')
+        ranked_doc_ids = Ranker.rank_relevant_docs(self._doc_ids, self._doc_products, normalized_query, norms, dates, k)
+        if self._trace is not None:
+            self._trace.mark('ranker')
+        return self.n_relevant, ranked_doc_ids
+
+    def _relevant_docs_from_posting(self, query_object, posting_lists=None):
         """
-        This function loads the posting list and counts the amount of relevant documents per term.
+        This function expands the query and loads the posting lists of its terms.
         :param query_object: contains, tokens-frequency dict, query text, length etc.
-        :return: dictionary of relevant documents mapping doc_id to document frequency.
+        :param posting_lists: posting lists fetched for the previous queries of a batch, as arrays.
+        the posting lists of the query are added to it.
+        :return: dictionary mapping a query term to its posting list
         """
         try:
             self._model.query_expansion(query_object)
         except:
             pass
+        if self._trace is not None:
+            self._trace.mark('query_expansion')
 
         query_dict = query_object.query_dict
-        for term in query_dict:
+        for term in list(query_dict):
             if term in self._indexer.inverted_idx:
                 continue
 
@@ -73,39 +177,152 @@ class Searcher:
 
         relevant_posting_lists = {}
         for term in query_dict:
-            if term in self._indexer.postingDict:
-                relevant_posting_lists[term] = self._indexer.postingDict[term]
+            if posting_lists is not None and term in posting_lists:
+                relevant_posting_lists[term] = posting_lists[term]
 
-        self.document_dict_init(relevant_posting_lists, query_object.query_length)
+            elif self._indexer._is_term_exist(term):
+                posting_list = self._indexer.get_term_posting_list(term)
+                if posting_lists is not None:
+                    posting_list = PostingList(doc_ids=np.asarray(posting_list.doc_ids, dtype=np.int64),
+                                               weights=np.asarray(posting_list.weights, dtype=np.float32))
+                    posting_lists[term] = posting_list
+                relevant_posting_lists[term] = posting_list
 
         query_object.query_dict = query_dict
+        if self._trace is not None:
+            self._trace.mark('posting_lookup')
 
-        return self._docs_dict
+        return relevant_posting_lists
 
-    def document_dict_init(self, postingDict, query_length):
+    def index_term(self, term):
+        """
+        :param term: a term of the query
+        :return: the term as it is found in the index (an upper-case term may be kept in lower-case and
+        the other way around), None if it is not in the index
         """
-        calculates tf-idf to every single document relevant for the query
-        :param postingDict:
-        :param query_length:
+        inverted_idx = self._indexer.inverted_idx
+        if term in inverted_idx:
+            return term
+        if term.isupper() and term.lower() in inverted_idx:
+            return term.lower()
+        if term.islower() and term.upper() in inverted_idx:
+            return term.upper()
+        return None
+
+    def phrase_docs(self, phrases):
+        """
+        finds the docs holding all the phrases of a query, by intersecting the positions of their terms.
+        :param phrases: the phrases of the query, as returned by Parse.parse_phrase
+        :return: sorted numpy array of the doc ids, None if the query has no phrase to search
+        (or the index keeps no positions)
+        """
+        doc_ids = None
+        for terms, window in phrases:
+            phrase_doc_ids = self.match_phrase(terms, window)
+            if phrase_doc_ids is not None:
+                doc_ids = phrase_doc_ids if doc_ids is None else np.intersect1d(doc_ids, phrase_doc_ids)
+        return doc_ids
+
+    def match_phrase(self, terms, window=None):
+        """
+        positional intersection. every occurrence of a term is keyed by doc id * span + position, the span
+        leaving room for the shifts and the window, so the keys of different docs never meet.
+        the terms which are not in the index (stop words of the index, terms of a single doc) are skipped.
+        :param terms: (term, position in the phrase) pairs
+        :param window: the terms are searched within a window of this many positions, in any order.
+        None - the terms are searched at their positions in the phrase (an exact phrase)
+        :return: sorted numpy array of the doc ids holding the phrase, None if no term of the phrase is searched
+        """
+        occurrences = []
+        for term, position in terms:
+            index_term = self.index_term(term)
+            if index_term is None:
+                continue
+            term_occurrences = self._indexer.get_term_occurrences(index_term)
+            if term_occurrences is None:  # the index keeps no positions
+                return None
+            occurrences.append((term_occurrences, position))
+        if not occurrences:
+            return None
+
+        # only the docs holding all the terms are intersected by position
+        doc_ids = occurrences[0][0][0]
+        for (term_doc_ids, _), _ in occurrences[1:]:
+            doc_ids = np.intersect1d(doc_ids, term_doc_ids)
+        if len(occurrences) == 1 or len(doc_ids) == 0:
+            return np.unique(doc_ids)
+
+        # an exact phrase is keyed by the position it would start at, given the position of the term in it
+        last_position = max(position for _, position in occurrences)
+        shifts = [last_position - position if window is None else 0 for _, position in occurrences]
+        max_position = max(int(term_positions.max(initial=0)) for (_, term_positions), _ in occurrences)
+        span = max_position + max(shifts) + (window or 0) + 2
+        keys = []
+        for ((term_doc_ids, term_positions), _), shift in zip(occurrences, shifts):
+            in_docs = np.isin(term_doc_ids, doc_ids)
+            keys.append(np.unique(term_doc_ids[in_docs] * span + term_positions[in_docs] + shift))
+
+        if window is None:
+            # a phrase is found where all the terms share a key
+            starts = keys[0]
+            for term_keys in keys[1:]:
+                starts = np.intersect1d(starts, term_keys, assume_unique=True)
+            return np.unique(starts // span)
+
+        # a window starts at an occurrence of a term, and ends at the first occurrence of every term after it
+        starts = np.unique(np.concatenate(keys))
+        ends = np.zeros(len(starts), dtype=np.int64)
+        for term_keys in keys:
+            following = np.searchsorted(term_keys, starts)
+            in_window = following < len(term_keys)
+            term_ends = np.full(len(starts), np.iinfo(np.int64).max)
+            term_ends[in_window] = term_keys[following[in_window]]
+            ends = np.maximum(ends, term_ends)
+        return np.unique(starts[ends - starts < window] // span)
+
+    def document_dict_init(self, postingDict, normalized_query, norms, doc_filter=None):
+        """
+        gathers the tf-idf of every single document relevant for the query, precomputed in the index,
+        and sums its products with the query weights - the dot product of every relevant doc and the query
+        (the docs are kept in the order they are first met).
+        :param postingDict: dictionary mapping a query term to its PostingList
+        :param normalized_query:
+        :param norms: numpy array of the norms of the document vectors, indexed by doc id
+        :param doc_filter: sorted numpy array of the only docs which may be relevant, None - any doc
         :return:
         """
-        tf_idf_list = [0] * query_length
-
-        for idx, (term, doc_list) in enumerate(postingDict.items()):
-            for doc_tuple in doc_list:
-                if doc_tuple[0] not in self._docs_dict:
-                    self._docs_dict[doc_tuple[0]] = tf_idf_list
-
-                try:
-                    dfi = self._indexer.inverted_idx[term]
-                except:
-                    dfi = self._indexer.inverted_idx[term.lower()]
-
-                idf = math.log(self.number_of_documents / dfi, 10)
-                tf_idf = idf * doc_tuple[2]
-
-                self._docs_dict[doc_tuple[0]][idx] = tf_idf
-                tf_idf_list = [0] * query_length
+        self._doc_ids = np.zeros(0, dtype=np.int64)
+        self._doc_products = np.zeros(0)
+        self.n_relevant = self.postings = 0
+
+        doc_ids, columns, weights = [], [], []
+        for idx, (term, posting_list) in enumerate(postingDict.items()):
+            doc_ids.append(np.asarray(posting_list.doc_ids, dtype=np.int64))
+            weights.append(np.asarray(posting_list.weights, dtype=np.float64))
+            columns.append(np.full(len(posting_list), idx, dtype=np.int64))
+
+        if not doc_ids:
+            return
+
+        doc_ids = np.concatenate(doc_ids)
+        columns = np.concatenate(columns)
+        normalized_query = np.asarray(normalized_query, dtype=np.float64)
+        products = np.concatenate(weights) * normalized_query[columns]
+        if doc_filter is not None:
+            kept_postings = np.isin(doc_ids, doc_filter)
+            doc_ids, columns, products = doc_ids[kept_postings], columns[kept_postings], products[kept_postings]
+            if len(doc_ids) == 0:
+                return
+        unique_doc_ids, first_seen, rows = np.unique(doc_ids, return_index=True, return_inverse=True)
+        order = np.argsort(first_seen, kind='stable')
+        position = np.empty_like(order)
+        position[order] = np.arange(len(order))
+        rows = position[rows.ravel()]
+
+        self._doc_ids = unique_doc_ids[order]
+        self.n_relevant = len(self._doc_ids)
+        self.postings = len(rows)
+        self._doc_products = np.bincount(rows, weights=products, minlength=len(self._doc_ids))
 
     def normalized_query(self, query):
         """
@@ -127,33 +344,26 @@ class Searcher:
 class Spell_Searcher:
     def __init__(self, indexer):
         self._indexer = indexer
-        self.spell = None
 
     def query_expansion(self, query):
         """
         This function finds a misspelled word and finds its closest similarity.
-        first by tracking all of its candidates. the candidate with the most appearances in the inverted index
-        will be the "replaced"
+        first by tracking all of its candidates (words at edit distance 1, from the spelling index of the indexer).
+        the candidate with the most appearances in the inverted index will be the "replaced"
         :param query: query dictionary
         :return: query dictionary with replaced correct words.
         """
-        try:
-            self.spell = SpellChecker(local_dictionary='spell_dict.json', distance=1)
-        except:
-            pass
+        spell_index = self._indexer.spell_index
+        if spell_index is None:
+            return
 
         query_dict = query.query_dict
-        for term in query_dict:
+        for term in list(query_dict):
 
             if term.lower() not in self._indexer.inverted_idx and term.upper() not in self._indexer.inverted_idx:
 
-                misspelled_checker = self.spell.unknown([term])
-
-                if len(misspelled_checker) != 0:
-                    candidates = list(self.spell.edit_distance_1(term))
-
-                    super_candidates = list(self.spell.candidates(term))
-                    candidates.extend(super_candidates)
+                if not spell_index.known(term):
+                    candidates = spell_index.lookup(term)
 
                     max_freq_in_corpus = 0
                     max_freq_name = ''
@@ -244,10 +454,22 @@ class Thesaurus_Searcher:
 
 
 class WordNet_Searcher:
+    _load_lock = threading.Lock()
 
     def __init__(self, indexer):
         self._indexer = indexer
 
+    @staticmethod
+    def load_wordnet():
+        """
+        nltk reads a corpus on its first use, which is not thread safe - the first query loads it under a lock.
+        """
+        with WordNet_Searcher._load_lock:
+            try:
+                wordnet.synsets
+            except LookupError:  # not installed, the words are not expanded
+                pass
+
     def query_expansion(self, query):
         """
         for each word in query.query_text apply Part Of Speech tagging.
@@ -256,6 +478,7 @@ class WordNet_Searcher:
         :param query:
         :return:
         """
+        self.load_wordnet()
 
         query_dict = query.query_dict
         query_length = query.query_length
@@ -0,0 +1,67 @@
+import heapq
+import itertools
+import os
+import pickle
+from posting_list import PostingList
+
+
+def block_sort_key(term):
+    """
+    blocks are sorted by the lower-case form of the term first, so all the case variants
+    of a word (OBAMA, obama) are adjacent and can be folded together while merging.
+    :param term: a term in the index
+    :return: sort key of the term
+    """
+    return term.lower(), term
+
+
+def write_block(path, posting_dict):
+    """
+    writes the postings that are currently held in memory to disk as a sorted block.
+    every record in the block is a pickled (term, posting_list) tuple.
+    :param path: block file path
+    :param posting_dict: dictionary mapping a term to its posting list
+    :return: -
+    """
+    with open(path, 'wb') as f:
+        for term in sorted(posting_dict, key=block_sort_key):
+            pickle.dump((term, posting_dict[term]), f, pickle.HIGHEST_PROTOCOL)
+
+
+def read_block(path):
+    """
+    streams the records of a block file one by one.
+    :param path: block file path
+    :return: generator of (term, posting_list) tuples
+    """
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def merge_blocks(paths):
+    """
+    k-way merge of sorted block files. only one record per block is kept in memory.
+    the postings of the same term are concatenated in block order, so the documents stay
+    in the order they were indexed.
+    :param paths: block file paths, in the order they were written
+    :return: generator of lists of (term, posting_list) tuples, one list per lower-case term
+    """
+    records = heapq.merge(*[read_block(path) for path in paths], key=lambda record: block_sort_key(record[0]))
+    for _, group in itertools.groupby(records, key=lambda record: record[0].lower()):
+        merged = []
+        for term, term_records in itertools.groupby(group, key=lambda record: record[0]):
+            posting_list = PostingList()
+            for _, postings in term_records:
+                posting_list.extend(postings)
+            merged.append((term, posting_list))
+        yield merged
+
+
+def remove_blocks(paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,93 @@
+class SymSpell:
+    """
+    Symmetric delete spelling index (SymSpell). Every word of the dictionary is stored under the
+    strings left by deleting one of its characters, so the words at edit distance 1 from a query word
+    are found by looking up the query word and its own deletes, without generating the inserts and
+    replacements over the alphabet. The cost of a lookup depends on the word length only.
+    Words are kept in lower-case.
+    """
+
+    def __init__(self):
+        self._deletes = {}  # a word, or a word with one character deleted, to the words it comes from
+        self.number_of_words = 0
+
+    @staticmethod
+    def deletes(word):
+        """
+        :param word: a word
+        :return: set of the strings left by deleting one character of the word
+        """
+        return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+    def add_word(self, word):
+        """
+        :param word: a word of the dictionary
+        :return: -
+        """
+        word = word.lower()
+        if self.known(word):
+            return
+        for key in self.deletes(word) | {word}:
+            if key not in self._deletes:
+                self._deletes[key] = []
+            self._deletes[key].append(word)
+        self.number_of_words += 1
+
+    def add_words(self, words):
+        for word in words:
+            self.add_word(word)
+
+    def update(self, other):
+        """
+        adds the words of another spelling index, none of which is in this one (see Indexer.save_spell).
+        :param other: SymSpell
+        :return: -
+        """
+        for key, words in other._deletes.items():
+            if key not in self._deletes:
+                self._deletes[key] = []
+            self._deletes[key].extend(words)
+        self.number_of_words += other.number_of_words
+
+    def known(self, word):
+        """
+        :param word: a word
+        :return: True if the word is in the dictionary
+        """
+        word = word.lower()
+        return word in self._deletes.get(word, ())
+
+    def lookup(self, word):
+        """
+        finds the words of the dictionary at edit distance 1 from word (a deletion, an insertion,
+        a replacement or a transposition of adjacent characters).
+        :param word: a word
+        :return: sorted list of the words, the word itself is included when it is known
+        """
+        word = word.lower()
+        candidates = set()
+        for key in self.deletes(word) | {word}:
+            candidates.update(self._deletes.get(key, ()))
+        return sorted(candidate for candidate in candidates if self.within_one_edit(word, candidate))
+
+    @staticmethod
+    def within_one_edit(word, other):
+        """
+        two words sharing a delete may still be 2 edits apart (abc, bcd), so the candidates are checked.
+        :return: True if the edit distance (with adjacent transpositions) of the words is at most 1
+        """
+        if len(word) == len(other):
+            diff = [i for i in range(len(word)) if word[i] != other[i]]
+            if len(diff) <= 1:
+                return True
+            return len(diff) == 2 and diff[1] == diff[0] + 1 and word[diff[0]] == other[diff[1]] and \
+                word[diff[1]] == other[diff[0]]
+
+        if abs(len(word) - len(other)) != 1:
+            return False
+        if len(word) > len(other):
+            word, other = other, word
+        i = 0
+        while i < len(word) and word[i] == other[i]:
+            i += 1
+        return word[i:] == other[i + 1:]
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+
+class TermCache:
+    """
+    LRU cache of the terms made of the tokens, bounded by its number of entries.
+    Only results depending on the token alone are cached (the stem of a word, the term of a token
+    no parsing rule applies to, the terms of a url), the side effects of parsing - the capital letters
+    and entities of the corpus - are still applied for every token.
+    Queries parsed by several threads share the cache without a lock: an entry evicted by one thread while
+    another one reads it is simply recomputed, and the counters may miss a few lookups.
+    """
+
+    MISSING = object()  # returned by get for a token which is not cached
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        :param key: (kind of the normalization - such as 'stem' or 'token', token)
+        :return: the cached term (None - the token is not indexed), MISSING if the token is not cached
+        """
+        term = self._entries.get(key, TermCache.MISSING)
+        if term is TermCache.MISSING:
+            self.misses += 1
+            return term
+        self.hits += 1
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:  # evicted by another thread meanwhile
+            pass
+        return term
+
+    def put(self, key, term):
+        """
+        caches a term, evicting the least recently used entry when the cache is full.
+        :param key: (kind of the normalization - such as 'stem' or 'token', token)
+        :param term: the term of the token, None if the token is not indexed
+        :return: -
+        """
+        self._entries[key] = term
+        if len(self._entries) > self.max_entries:
+            try:
+                self._entries.popitem(last=False)
+            except KeyError:  # emptied by another thread meanwhile
+                return
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        :return: dictionary of the cache counters
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions, 'entries': len(self._entries)}
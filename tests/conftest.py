@@ -0,0 +1,43 @@
+import pytest
+from configuration import ConfigClass
+from parser_module import Parse
+import search_engine_3
+from tests.corpus import make_tweets, write_corpus
+
+
+@pytest.fixture(autouse=True)
+def corpus_stats():
+    """the corpus statistics of the parser are class level, every test starts from an empty corpus"""
+    Parse.CAPITAL_LETTER_DICT, Parse.ENTITY_DICT, Parse.AMOUNT_OF_NUMBERS_IN_CORPUS = {}, {}, 0
+    yield
+    Parse.CAPITAL_LETTER_DICT, Parse.ENTITY_DICT, Parse.AMOUNT_OF_NUMBERS_IN_CORPUS = {}, {}, 0
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """config of an engine saving its index in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    config = ConfigClass()
+    config.tokenizer = "regex"
+    config.queryCacheBudget = None
+    return config
+
+
+@pytest.fixture
+def tweets():
+    return make_tweets(120)
+
+
+@pytest.fixture
+def build_engine(config):
+    """
+    :return: function building an engine (search_engine_3) from a list of tweets, finalized unless told otherwise
+    """
+    def build(tweets, fn='corpus.parquet', finalize=True, **config_values):
+        for name, value in config_values.items():
+            setattr(config, name, value)
+        engine = search_engine_3.SearchEngine(config)
+        engine.last_parquet = finalize
+        engine.build_index_from_parquet(write_corpus(fn, tweets))
+        return engine
+    return build
@@ -0,0 +1,53 @@
+import random
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CORPUS_COLUMNS = ['tweet_id', 'tweet_date', 'full_text', 'urls', 'indices', 'retweet_text', 'retweet_urls',
+                  'retweet_indices', 'quoted_text', 'quote_urls', 'quoted_indices', 'retweet_quoted_text',
+                  'retweet_quoted_urls', 'retweet_quoted_indices']
+WORDS = ['vaccine', 'clinic', 'research', 'lockdown', 'school', 'hospital', 'doctor', 'nurse', 'test', 'case',
+         'death', 'spread', 'travel', 'border', 'economy', 'market', 'worker', 'family', 'distance', 'symptom',
+         'fever', 'cough', 'trial', 'study', 'cure', 'drug', 'patient', 'outbreak', 'city', 'state']
+PHRASE_TWEETS = ['herd immunity is the only way out', 'the herd will never reach immunity this year',
+                 'immunity of the herd is a myth', 'experts doubt herd immunity for the virus']
+QUERIES = ['vaccine', 'clinic school', 'research spread city', 'hospital nurse doctor', 'fever cough symptom',
+           'economy market worker', 'trial drug cure study', 'herd immunity', 'travel border lockdown',
+           'death case test']
+
+
+def make_tweets(count, seed=0, first_id=1000):
+    """
+    :return: list of (tweet id, text) pairs of generated tweets, lower-case words of WORDS and the phrase tweets.
+    none of WORDS is removed by the finalize of the index (see Indexer.TERMS_TO_REMOVE)
+    """
+    generator = random.Random(seed)
+    texts = [' '.join(generator.choice(WORDS) for _ in range(generator.randint(4, 12))) for _ in range(count)]
+    step = max(1, count // len(PHRASE_TWEETS))
+    for i, text in enumerate(PHRASE_TWEETS):
+        texts[i * step] = text
+    return [(str(first_id + i), text) for i, text in enumerate(texts)]
+
+
+def write_corpus(fn, tweets):
+    """
+    writes tweets as a parquet file in the layout of the corpus.
+    :param fn: path of the parquet file
+    :param tweets: list of (tweet id, text) pairs
+    :return: fn
+    """
+    columns = {name: [None] * len(tweets) for name in CORPUS_COLUMNS}
+    columns['tweet_id'] = [tweet_id for tweet_id, _ in tweets]
+    columns['tweet_date'] = ['Mon Jul {:02d} 00:32:26 +0000 2020'.format(1 + i % 28) for i in range(len(tweets))]
+    columns['full_text'] = [text for _, text in tweets]
+    columns['urls'] = columns['retweet_urls'] = columns['quote_urls'] = ['{}'] * len(tweets)
+    pq.write_table(pa.table({name: pa.array(values, type=pa.string()) for name, values in columns.items()}), fn)
+    return fn
+
+
+def matching_tweets(tweets, query):
+    """
+    :return: set of the ids of the tweets holding a word of the query
+    """
+    words = set(query.split())
+    return {tweet_id for tweet_id, text in tweets if words & set(text.split())}
+
@@ -0,0 +1,40 @@
+import os
+import pytest
+from tests.corpus import QUERIES, make_tweets
+import search_engine_3
+
+
+def test_load_index(build_engine, config, tweets):
+    engine = build_engine(tweets)
+    loaded = search_engine_3.SearchEngine(config)
+    loaded.load_index('inverted_idx.pkl')
+    for query in QUERIES:
+        assert loaded.search(query) == engine.search(query), query
+
+
+def test_reader_of_an_index_saved_over(build_engine, config, tweets):
+    """a reader keeps searching the index it loaded while another index is saved at the same path"""
+    build_engine(tweets)
+    reader = search_engine_3.SearchEngine(config)
+    reader.load_index('inverted_idx.pkl')
+    expected = [reader.search(query) for query in QUERIES]
+
+    rebuilt = build_engine(make_tweets(60, seed=1, first_id=5000), fn='new.parquet')
+    assert [reader.search(query) for query in QUERIES] == expected
+    assert rebuilt.search('vaccine') != reader.search('vaccine')
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='the files mapped by a reader are not removed on windows')
+def test_retired_segments_removed(build_engine, config, tweets):
+    """the segments an index no longer lists are removed by the save after the one retiring them"""
+    build_engine(tweets)
+    reader = search_engine_3.SearchEngine(config)
+    reader.load_index('inverted_idx.pkl')
+    expected = [reader.search(query) for query in QUERIES]
+    first_segment = reader._indexer.disk_index.segments[0].path
+
+    build_engine(make_tweets(60, seed=1, first_id=5000), fn='new.parquet')
+    assert os.path.exists(first_segment + '.postings')
+    build_engine(make_tweets(60, seed=2, first_id=7000), fn='newer.parquet')
+    assert not os.path.exists(first_segment + '.postings')
+    assert [reader.search(query) for query in QUERIES] == expected
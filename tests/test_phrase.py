@@ -0,0 +1,29 @@
+from tests.corpus import PHRASE_TWEETS
+
+
+def phrase_tweet_ids(tweets, *phrase_tweets):
+    return {tweet_id for tweet_id, text in tweets if text in phrase_tweets}
+
+
+def test_phrase_query(build_engine, tweets):
+    engine = build_engine(tweets)
+    n_relevant, tweet_ids = engine.search('"herd immunity"')
+    assert n_relevant == 2
+    assert set(tweet_ids) == phrase_tweet_ids(tweets, PHRASE_TWEETS[0], PHRASE_TWEETS[3])
+
+    _, tweet_ids = engine.search('herd immunity')
+    assert set(tweet_ids) == phrase_tweet_ids(tweets, *PHRASE_TWEETS)
+
+
+def test_phrase_query_unfinalized(build_engine, tweets):
+    engine = build_engine(tweets, finalize=False)
+    _, tweet_ids = engine.search('"herd immunity"')
+    assert set(tweet_ids) == phrase_tweet_ids(tweets, PHRASE_TWEETS[0], PHRASE_TWEETS[3])
+
+
+def test_proximity_query(build_engine, tweets):
+    engine = build_engine(tweets)
+    _, phrase = engine.search('"herd immunity"')
+    _, near = engine.search('"herd immunity"~5')
+    _, words = engine.search('herd immunity')
+    assert set(phrase) <= set(near) <= set(words)
@@ -0,0 +1,39 @@
+from tests.corpus import make_tweets, matching_tweets, write_corpus
+
+
+def test_query_cache(build_engine, tweets):
+    engine = build_engine(tweets, queryCacheBudget=1)
+    first = engine.search('vaccine')
+    assert engine.search('vaccine') == first
+    assert engine.query_cache_stats()['hits'] == 1
+
+
+def test_query_cache_invalidated_by_append(build_engine, tweets):
+    """the results cached before documents are appended to the index are not returned after"""
+    engine = build_engine(tweets, queryCacheBudget=1)
+    engine.search('vaccine')
+    new_tweets = make_tweets(40, seed=1, first_id=5000)
+    engine.add_parquet_to_index(write_corpus('new.parquet', new_tweets))
+
+    _, tweet_ids = engine.search('vaccine')
+    assert set(tweet_ids) == matching_tweets(tweets + new_tweets, 'vaccine')
+    assert engine.query_cache_stats()['invalidations'] == 1
+
+
+def test_query_cache_invalidated_by_new_documents(build_engine, tweets):
+    """an index which is still being built changes with every document added"""
+    engine = build_engine(tweets, finalize=False, queryCacheBudget=1)
+    engine.search('vaccine')
+    new_tweets = make_tweets(40, seed=1, first_id=5000)
+    engine.build_index_from_parquet(write_corpus('new.parquet', new_tweets))
+
+    _, tweet_ids = engine.search('vaccine')
+    assert set(tweet_ids) == matching_tweets(tweets + new_tweets, 'vaccine')
+
+
+def test_query_cache_invalidated_by_rebuild(build_engine, tweets):
+    """an index saved over another one at the same path is not taken for it"""
+    engine = build_engine(tweets)
+    version = engine._indexer.index_version()
+    rebuilt = build_engine(make_tweets(40, seed=1, first_id=5000), fn='new.parquet')
+    assert rebuilt._indexer.index_version() != version
@@ -0,0 +1,33 @@
+from tests.corpus import QUERIES, make_tweets, write_corpus
+
+
+def test_query_pool(build_engine, tweets):
+    """the batches are ranked on the same processes, and as on the main process"""
+    engine = build_engine(tweets, searchProcesses=2, searchMinQueries=2)
+    expected = [engine.search(query) for query in QUERIES]
+    assert engine.search_many(QUERIES) == expected
+    executor = engine._query_pool._executor
+    assert engine.search_many(QUERIES) == expected
+    assert engine._query_pool._executor is executor
+
+    engine.close()
+    assert engine._query_pool._executor is None
+
+
+def test_query_pool_small_batch(build_engine, tweets):
+    """a batch smaller than searchMinQueries is ranked on the main process"""
+    engine = build_engine(tweets, searchProcesses=2, searchMinQueries=len(QUERIES) + 1)
+    assert engine.search_many(QUERIES) == [engine.search(query) for query in QUERIES]
+    assert engine._query_pool._executor is None
+
+
+def test_query_pool_restarted_by_append(build_engine, tweets):
+    """the processes hold the document norms and dates, they are started again once the index grows"""
+    engine = build_engine(tweets, searchProcesses=2, searchMinQueries=2)
+    engine.search_many(QUERIES)
+    executor = engine._query_pool._executor
+    engine.add_parquet_to_index(write_corpus('new.parquet', make_tweets(40, seed=1, first_id=5000)))
+
+    assert engine.search_many(QUERIES) == [engine.search(query) for query in QUERIES]
+    assert engine._query_pool._executor is not executor
+    engine.close()
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import threading
+from urllib.parse import quote
+import pytest
+from query_server import QueryServer
+from tests.corpus import QUERIES
+
+
+@pytest.fixture
+def server(build_engine, config, tweets):
+    """a server of search_engine_3 searching on threads, listening on a free port"""
+    build_engine(tweets)
+    config.serverPort = 0
+    config.serverWorkers = 2
+    server = QueryServer('search_engine_3', 'inverted_idx.pkl', None, config)
+    yield server
+    server.close()
+
+
+async def request(reader, writer, request_line, connection='keep-alive'):
+    """
+    :return: HTTP status, connection header and the json body of the response to a request sent on a connection
+    """
+    writer.write('{}\r\nHost: localhost\r\nConnection: {}\r\n\r\n'.format(request_line, connection).encode('latin-1'))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1')
+        if not line.strip():
+            break
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers['content-length']))
+    return status, headers['connection'], json.loads(body)
+
+
+def run_with_server(server, client):
+    """
+    runs a client coroutine function against the server, the function is given the port the server listens on
+    """
+    async def run():
+        ready = asyncio.Event()
+        serving = asyncio.ensure_future(server.serve(ready=ready))
+        await ready.wait()
+        try:
+            return await client(server.port)
+        finally:
+            serving.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await serving
+    return asyncio.run(run())
+
+
+def test_query_server_statuses(server):
+    """requests served on a connection kept alive, the errors answered on it as well"""
+    async def client(port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        responses = [await request(reader, writer, 'GET /search?q={} HTTP/1.1'.format(quote(QUERIES[0]))),
+                     await request(reader, writer, 'GET /search HTTP/1.1'),
+                     await request(reader, writer, 'GET /search?q=%20 HTTP/1.1'),
+                     await request(reader, writer, 'GET /unknown HTTP/1.1'),
+                     await request(reader, writer, 'POST /search?q=economy HTTP/1.1'),
+                     await request(reader, writer, 'GET /stats HTTP/1.1', connection='close')]
+        closed = await reader.read() == b''
+        writer.close()
+        return responses, closed
+
+    responses, closed = run_with_server(server, client)
+    assert [status for status, _, _ in responses] == [200, 400, 400, 404, 405, 200]
+    assert [connection for _, connection, _ in responses] == ['keep-alive'] * 5 + ['close']
+    assert closed
+
+    n_relevant, tweet_ids = server._engine.search(QUERIES[0])
+    assert responses[0][2]['n_relevant'] == n_relevant
+    assert responses[0][2]['tweet_ids'] == [str(tweet_id) for tweet_id in tweet_ids]
+    stats = responses[-1][2]
+    assert stats['requests'] == 1 and stats['searches'] == 1 and stats['errors'] == 0
+    assert stats['latency_p50_ms'] <= stats['latency_p95_ms'] <= stats['latency_p99_ms']
+
+
+def test_query_server_coalesces(server):
+    """identical queries in flight are searched once, the requests get the results of the same search"""
+    n_requests = 5
+    search = server._engine.search
+    release = threading.Event()
+
+    def held_search(query):
+        release.wait(10)
+        return search(query)
+    server._engine.search = held_search
+
+    async def client(port):
+        connections = [await asyncio.open_connection('127.0.0.1', port) for _ in range(n_requests)]
+        line = 'GET /search?q={} HTTP/1.1'.format(quote(QUERIES[0]))
+        pending = [asyncio.ensure_future(request(reader, writer, line, connection='close'))
+                   for reader, writer in connections]
+        while server.requests < n_requests:  # every request waits for the held search
+            await asyncio.sleep(0.01)
+        release.set()
+        responses = await asyncio.gather(*pending)
+        for _, writer in connections:
+            writer.close()
+        return responses
+
+    responses = run_with_server(server, client)
+    assert server.searches == 1 and server.coalesced == n_requests - 1
+    assert sorted(body['coalesced'] for _, _, body in responses) == [False] + [True] * (n_requests - 1)
+    assert len({tuple(body['tweet_ids']) for _, _, body in responses}) == 1
+    assert max(body['queue_depth'] for _, _, body in responses) == 1
+    assert server.stats()['max_queue_depth'] == 1
@@ -0,0 +1,78 @@
+import os
+import numpy as np
+import pytest
+from tests.corpus import QUERIES, make_tweets, matching_tweets, write_corpus
+import search_engine_3
+import utils
+
+
+def test_segment_append(build_engine, config, tweets):
+    """
+    documents appended as a new segment are searched with the older ones. the documents of the older segment
+    keep the weights and norms they were saved with, so only the docs found are those of an index built at once.
+    """
+    new_tweets = make_tweets(40, seed=1, first_id=5000)
+    build_engine(tweets, fn='first.parquet')
+    appended = search_engine_3.SearchEngine(config)
+    appended.add_parquet_to_index(write_corpus('new.parquet', new_tweets))
+    assert len(appended._indexer.disk_index.segments) == 2
+    assert appended._indexer.generation > 1
+
+    loaded = search_engine_3.SearchEngine(config)
+    loaded.load_index('inverted_idx.pkl')
+    for query in QUERIES:
+        n_relevant, tweet_ids = appended.search(query)
+        assert set(tweet_ids) == matching_tweets(tweets + new_tweets, query), query
+        assert loaded.search(query) == (n_relevant, tweet_ids), query
+
+
+def test_append_keeps_segment_weights(build_engine, config, tweets):
+    """
+    every segment is searched with the idf its terms had when it was saved, so the weights of every document
+    are still the ones its norm was computed from, in the older segment as well
+    """
+    build_engine(tweets, fn='first.parquet')
+    appended = search_engine_3.SearchEngine(config)
+    appended.add_parquet_to_index(write_corpus('new.parquet', make_tweets(40, seed=1, first_id=5000)))
+
+    indexer = appended._indexer
+    squared_norms = np.zeros(len(indexer.doc_ids))
+    for term in indexer.inverted_idx:
+        posting_list = indexer.get_term_posting_list(term)
+        np.add.at(squared_norms, np.asarray(posting_list.doc_ids),
+                  np.asarray(posting_list.weights, dtype=np.float64) ** 2)
+    assert np.allclose(np.sqrt(squared_norms), indexer.document_norms(), rtol=1e-5)
+
+
+@pytest.mark.parametrize('memory_budget', [None, 0.002])
+def test_append_folds_saved_capital_term(build_engine, config, memory_budget):
+    """
+    a term kept in upper-case by the older segments is folded into its lower-case form once the lower-case form
+    is seen in the new documents, with the documents of the older segments counted for it
+    """
+    build_engine([(str(1000 + i), 'Obama speaks about the economy') for i in range(20)], toStem=False,
+                 indexMemoryBudget=memory_budget)
+    appended = search_engine_3.SearchEngine(config)
+    appended.add_parquet_to_index(write_corpus('new.parquet', [('5000', 'obama on the economy')]))
+    assert appended._indexer.disk_index.aliases == {'OBAMA': 'obama'}
+    n_relevant, tweet_ids = appended.search('obama')
+    assert n_relevant == 21
+    assert '5000' in tweet_ids
+
+
+def test_append_spell_index(build_engine, config, tweets):
+    """the spelling index of an appended segment holds only the words it adds, the index knows the words of both"""
+    build_engine(tweets, fn='first.parquet', toStem=False)
+    appended = search_engine_3.SearchEngine(config)
+    appended.add_parquet_to_index(write_corpus('new.parquet', [('5000', 'zeppelin over the vaccine clinic')]))
+
+    segments = appended._indexer.disk_index.segments
+    new_words = utils.load_obj(segments[1].path + '.spell')
+    assert new_words.known('zeppelin') and not new_words.known('vaccine')
+    assert not os.path.exists('spell_dict.json')
+
+    loaded = search_engine_3.SearchEngine(config)
+    loaded.load_index('inverted_idx.pkl')
+    spell_index = loaded._indexer.spell_index
+    assert spell_index.known('zeppelin') and spell_index.known('vaccine')
+    assert spell_index.lookup('zepelin') == ['zeppelin']
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from indexer import Indexer
+from tests.corpus import QUERIES
+
+
+def index_terms(engine):
+    return sorted(engine._indexer.inverted_idx.keys())
+
+
+def assert_same_postings(engine, expected_engine):
+    assert index_terms(engine) == index_terms(expected_engine)
+    for term in index_terms(expected_engine):
+        posting_list = engine._indexer.get_term_posting_list(term)
+        expected = expected_engine._indexer.get_term_posting_list(term)
+        assert np.array_equal(posting_list.doc_ids, expected.doc_ids), term
+        assert np.array_equal(posting_list.tfs, expected.tfs), term
+        assert np.allclose(posting_list.weights, expected.weights), term
+        occurrences = engine._indexer.get_term_occurrences(term)
+        expected_occurrences = expected_engine._indexer.get_term_occurrences(term)
+        assert all(np.array_equal(a, b) for a, b in zip(occurrences, expected_occurrences)), term
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_spimi_merge(build_engine, tweets, monkeypatch, compress):
+    """an index merged from blocks flushed to disk is the index built in memory"""
+    in_memory = build_engine(tweets, compressPostings=compress)
+    flushes = []
+    flush_block = Indexer.flush_block
+    monkeypatch.setattr(Indexer, 'flush_block', lambda indexer: flushes.append(1) or flush_block(indexer))
+    merged = build_engine(tweets, fn='merged.parquet', indexMemoryBudget=0.002)
+    assert len(flushes) > 10
+    assert_same_postings(merged, in_memory)
+    for query in QUERIES:
+        assert merged.search(query) == in_memory.search(query), query
@@ -0,0 +1,40 @@
+import numpy as np
+import vbyte
+
+
+def test_round_trip():
+    numbers = [0, 1, 127, 128, 300, 16383, 16384, 2 ** 31, 2 ** 63 - 1]
+    buffer = vbyte.encode(numbers)
+    assert list(vbyte.decode(buffer, 0, len(buffer))) == numbers
+    assert vbyte.decode_array(buffer, 0, len(buffer)).tolist() == numbers
+
+
+def test_one_byte_per_small_number():
+    assert len(vbyte.encode(range(128))) == 128
+    assert len(vbyte.encode([128])) == 2
+
+
+def test_empty():
+    assert vbyte.encode([]) == b''
+    assert list(vbyte.decode(b'', 0, 0)) == []
+    assert len(vbyte.decode_array(b'', 0, 0)) == 0
+
+
+def test_offset():
+    prefix, numbers = vbyte.encode([5, 1000]), [7, 70000, 3]
+    buffer = prefix + vbyte.encode(numbers)
+    assert vbyte.decode_array(buffer, len(prefix), len(buffer) - len(prefix)).tolist() == numbers
+
+
+def test_gaps_round_trip():
+    doc_ids = np.unique(np.random.RandomState(0).randint(0, 10 ** 6, 5000))
+    buffer = vbyte.encode_gaps(doc_ids)
+    assert vbyte.decode_gaps_array(buffer, 0, len(buffer)).tolist() == doc_ids.tolist()
+    assert list(vbyte.decode_gaps(buffer, 0, len(buffer))) == doc_ids.tolist()
+
+
+def test_position_gaps_round_trip():
+    counts = [3, 0, 1, 4]
+    positions = [2, 5, 9, 0, 1, 2, 30, 31]
+    buffer = vbyte.encode_position_gaps(positions, counts)
+    assert vbyte.decode_position_gaps_array(buffer, 0, len(buffer), counts).tolist() == positions
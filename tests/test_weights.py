@@ -0,0 +1,19 @@
+from tests.corpus import QUERIES, matching_tweets
+
+
+def test_build_and_search(build_engine, tweets):
+    engine = build_engine(tweets)
+    for query in QUERIES:
+        n_relevant, tweet_ids = engine.search(query)
+        assert n_relevant == len(tweet_ids) > 0
+        assert set(tweet_ids) == matching_tweets(tweets, query), query
+
+
+def test_search_before_finalize(build_engine, tweets):
+    """an index which was built but not saved yet is searched with the weights and norms of its documents so far"""
+    unfinalized = build_engine(tweets, finalize=False)
+    assert not unfinalized._indexer.finalized
+    for query in QUERIES:
+        n_relevant, tweet_ids = unfinalized.search(query)
+        assert n_relevant == len(tweet_ids) > 0
+        assert set(tweet_ids) == matching_tweets(tweets, query), query
@@ -0,0 +1,84 @@
+import sys
+import time
+import pyarrow.parquet as pq
+from nltk.tokenize import word_tokenize
+from parser_module import Parse
+
+SAMPLE_FILES = ['sample.parquet', 'sample2.parquet', 'sample3.parquet']
+
+
+def read_sample(fn):
+    """
+    the sample files hold the texts of the tweets only, they are laid out like the rows of the corpus
+    (their urls are not in the format of the corpus and are left out).
+    :param fn: path to a sample parquet file
+    :return: list of documents as lists
+    """
+    documents = []
+    for row in pq.read_table(fn).to_pylist():
+        documents.append([row['tweet_id'], row['tweet_date'], row['full_text'], '{}', None, row['retweet_text'], '{}',
+                          None, row['quote_text'], '{}', None, None, None, None])
+    return documents
+
+
+def nltk_tokenizer():
+    """
+    :return: nltk's word_tokenize, without its sentence splitting when the punkt models are not installed
+    """
+    try:
+        word_tokenize("punkt.")
+        return word_tokenize
+    except LookupError:
+        print("punkt is not installed, nltk is run with preserve_line=True (no sentence splitting)")
+        return lambda text: word_tokenize(text, preserve_line=True)
+
+
+def parse_documents(documents, tokenize, repeat=3):
+    """
+    parses the documents with a fresh parser.
+    :param documents: list of documents as lists
+    :param tokenize: the tokenizer of the parser
+    :param repeat: number of times the documents are parsed, for the timing
+    :return: (term to (df, total tf), tokens of every document, docs/sec)
+    """
+    timings = []
+    for _ in range(repeat):
+        Parse.CAPITAL_LETTER_DICT, Parse.ENTITY_DICT, Parse.AMOUNT_OF_NUMBERS_IN_CORPUS = {}, {}, 0
+        parser = Parse()
+        parser.STEMMER = False
+        parser.tokenize = tokenize
+        start = time.perf_counter()
+        parsed_documents = [parser.parse_doc(document) for document in documents]
+        timings.append(time.perf_counter() - start)
+
+    terms = {}
+    for document in parsed_documents:
+        for term, tf in document.term_doc_dictionary.items():
+            df, total = terms.get(term, (0, 0))
+            terms[term] = (df + 1, total + tf)
+    tokens = [tokenize(parser.non_latin_pattern.sub('', parser.concatenate_tweets(
+        document[2], document[5], document[11], document[8]))) for document in documents]
+    return terms, tokens, len(documents) / min(timings)
+
+
+def main(files=SAMPLE_FILES):
+    documents = [document for fn in files for document in read_sample(fn)]
+    nltk_terms, nltk_tokens, nltk_speed = parse_documents(documents, nltk_tokenizer())
+    regex_terms, regex_tokens, regex_speed = parse_documents(documents, Parse().regex_tokenize)
+
+    print("%d documents" % len(documents))
+    print("docs/sec: nltk %.0f, regex %.0f (x%.1f)" % (nltk_speed, regex_speed, regex_speed / nltk_speed))
+    print("documents tokenized differently: %d" % sum(a != b for a, b in zip(nltk_tokens, regex_tokens)))
+
+    only_nltk = sorted(set(nltk_terms) - set(regex_terms))
+    only_regex = sorted(set(regex_terms) - set(nltk_terms))
+    changed = sorted(term for term in set(nltk_terms) & set(regex_terms) if nltk_terms[term] != regex_terms[term])
+    print("terms: nltk %d, regex %d" % (len(nltk_terms), len(regex_terms)))
+    print("terms of nltk only: %d %s" % (len(only_nltk), only_nltk[:20]))
+    print("terms of regex only: %d %s" % (len(only_regex), only_regex[:20]))
+    print("terms with another df or tf: %d %s" % (len(changed), [(term, nltk_terms[term], regex_terms[term])
+                                                                  for term in changed[:20]]))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or SAMPLE_FILES)
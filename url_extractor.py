@@ -0,0 +1,94 @@
+import json
+from itertools import islice
+from term_cache import TermCache
+
+URL_COLUMNS = (3, 6, 9, 12)  # positions of the urls, retweet urls, quote urls and retweet quoted urls
+
+
+class UrlExtractor:
+    """
+    A stage ahead of the parser, extracting the terms of the urls of the documents a batch at a time.
+    The url columns of a batch are json decoded at once, and every url is split into terms once -
+    the decoded columns and the terms of the urls are kept in a TermCache, since the urls of retweets and
+    quotes repeat across the corpus. The terms are the ones Parse.parse_doc finds in the urls.
+    """
+
+    def __init__(self, parser, cache_size, batch_size):
+        """
+        :param parser: the Parse splitting the urls
+        :param cache_size: number of url columns and urls kept in the cache
+        :param batch_size: number of documents decoded at once
+        """
+        self._parser = parser
+        self.cache = TermCache(cache_size)
+        self.batch_size = batch_size
+
+    def extract(self, documents_list):
+        """
+        :param documents_list: iterable of documents as lists
+        :return: generator of (document, list of the terms of its urls), in the order of documents_list
+        """
+        documents = iter(documents_list)
+        for batch in iter(lambda: list(islice(documents, self.batch_size)), []):
+            yield from zip(batch, self.extract_batch(batch))
+
+    def extract_batch(self, batch):
+        """
+        :param batch: list of documents as lists
+        :return: list of the terms of the urls of every document
+        """
+        columns = {}
+        for document in batch:
+            for position in URL_COLUMNS:
+                urls = document[position]
+                if urls is not None and urls != "{}" and urls not in columns:
+                    columns[urls] = self.cache.get(('json', urls))
+        self.decode([urls for urls, decoded in columns.items() if decoded is TermCache.MISSING], columns)
+
+        batch_terms = []
+        for document in batch:
+            raw_urls = {}  # the urls of the document, once each
+            if document[3] == "{}":
+                url_from_text = self._parser.url_pattern.findall(document[2])
+                if len(url_from_text) > 0:
+                    raw_urls[url_from_text[0]] = None
+            for position in URL_COLUMNS:
+                urls = document[position]
+                if urls is not None and urls != "{}":
+                    raw_urls.update(dict.fromkeys(columns[urls]))
+
+            terms = []
+            for url in raw_urls:
+                terms.extend(self.url_terms(url))
+            batch_terms.append(terms)
+        return batch_terms
+
+    def decode(self, columns_to_decode, columns):
+        """
+        json decodes url columns with a single json.loads call, and caches them.
+        :param columns_to_decode: list of url columns (json objects mapping a short url to the expanded one)
+        :param columns: dictionary the urls of every decoded column are set in
+        :return: -
+        """
+        if not columns_to_decode:
+            return
+        try:
+            decoded_columns = json.loads('[' + ','.join(columns_to_decode) + ']')
+        except ValueError:  # raise for the column which is not valid json
+            decoded_columns = [json.loads(urls) for urls in columns_to_decode]
+
+        for urls, url_as_dict in zip(columns_to_decode, decoded_columns):
+            decoded = tuple(key if url_as_dict[key] is None else url_as_dict[key] for key in url_as_dict.keys())
+            columns[urls] = decoded
+            self.cache.put(('json', urls), decoded)
+
+    def url_terms(self, url):
+        """
+        :param url: a url
+        :return: the terms of the url, as found by Parse.parse_doc
+        """
+        terms = self.cache.get(('url', url))
+        if terms is TermCache.MISSING:
+            terms = tuple(self._parser.url_terms(self._parser.parse_url_text([url])))
+            self.cache.put(('url', url), terms)
+        return terms
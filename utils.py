@@ -1,4 +1,5 @@
 import json
+import os
 import pickle
 import requests
 import zipfile
@@ -21,6 +22,18 @@ def save_obj(obj, name):
         pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL)
 
 
+def replace_obj(obj, name):
+    """
+    saves an object as a pickle in a temporary file, renamed over the file in one step,
+    so a reader sees either the previous object or the new one whole.
+    :param obj: object to save
+    :param name: name of the pickle file.
+    :return: -
+    """
+    save_obj(obj, name + '.tmp')
+    os.replace(name + '.tmp', name)
+
+
 def load_obj(name):
     """
     This function will load a pickle file
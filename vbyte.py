@@ -0,0 +1,128 @@
+import numpy as np
+
+# Variable-byte integer codec: every number is split into 7 bit groups, lowest group first.
+# The last byte of a number has its high bit set.
+
+MAX_BYTES = 10  # enough for a uint64
+
+
+def encode(numbers):
+    """
+    :param numbers: sequence of non negative integers
+    :return: the encoded bytes
+    """
+    numbers = np.asarray(numbers, dtype=np.uint64)
+    if len(numbers) == 0:
+        return b''
+
+    groups = np.empty((len(numbers), MAX_BYTES), dtype=np.uint8)
+    length = np.ones(len(numbers), dtype=np.int64)
+    rest = numbers.copy()
+    for i in range(MAX_BYTES):
+        groups[:, i] = rest & np.uint64(0x7f)
+        rest >>= np.uint64(7)
+        length += rest > 0
+    width = int(length.max())
+
+    groups = groups[:, :width]
+    groups[np.arange(len(numbers)), length - 1] |= 0x80
+    return groups[np.arange(width) < length[:, None]].tobytes()
+
+
+def encode_gaps(doc_ids):
+    """
+    delta encodes sorted doc ids, every doc id is replaced by the gap from the one before it.
+    :param doc_ids: sorted sequence of doc ids
+    :return: the encoded bytes
+    """
+    doc_ids = np.asarray(doc_ids, dtype=np.int64)
+    return encode(np.diff(doc_ids, prepend=0))
+
+
+def decode(buffer, offset, length):
+    """
+    streaming decoder, numbers are decoded one at a time.
+    :param buffer: bytes like object
+    :param offset: offset of the first encoded byte
+    :param length: amount of encoded bytes
+    :return: generator of integers
+    """
+    number = 0
+    shift = 0
+    for byte in memoryview(buffer)[offset:offset + length]:
+        number |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            yield number
+            number = 0
+            shift = 0
+        else:
+            shift += 7
+
+
+def decode_gaps(buffer, offset, length):
+    """
+    streaming decoder of delta encoded doc ids.
+    :return: generator of doc ids
+    """
+    doc_id = 0
+    for gap in decode(buffer, offset, length):
+        doc_id += gap
+        yield doc_id
+
+
+def decode_array(buffer, offset, length):
+    """
+    decodes all the numbers at once with numpy.
+    :param buffer: bytes like object
+    :param offset: offset of the first encoded byte
+    :param length: amount of encoded bytes
+    :return: numpy array (int64) of the numbers
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8, count=length, offset=offset)
+    if length == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(data & 0x80)
+    starts = np.empty(len(ends), dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    shifts = (np.arange(length) - np.repeat(starts, ends - starts + 1)) * 7
+    values = (data & 0x7f).astype(np.int64) << shifts
+    return np.add.reduceat(values, starts)
+
+
+def decode_gaps_array(buffer, offset, length):
+    """
+    :return: numpy array (int64) of the doc ids
+    """
+    return np.cumsum(decode_array(buffer, offset, length))
+
+
+def encode_position_gaps(positions, counts):
+    """
+    delta encodes the positions of the postings of a list, every posting restarts from 0.
+    :param positions: the sorted positions of every posting, one after the other
+    :param counts: amount of positions of every posting
+    :return: the encoded bytes
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    gaps = np.diff(positions, prepend=0)
+    starts = (np.cumsum(counts) - counts)[counts > 0]
+    gaps[starts] = positions[starts]
+    return encode(gaps)
+
+
+def decode_position_gaps_array(buffer, offset, length, counts):
+    """
+    :param counts: amount of positions of every posting
+    :return: numpy array (int64) of the positions of every posting, one after the other
+    """
+    gaps = decode_array(buffer, offset, length)
+    if len(gaps) == 0:
+        return gaps
+    counts = np.asarray(counts, dtype=np.int64)
+    sums = np.cumsum(gaps)
+    ends = np.cumsum(counts)
+    before = np.zeros(len(counts), dtype=np.int64)
+    before[1:] = np.where(ends[:-1] > 0, sums[np.maximum(ends[:-1] - 1, 0)], 0)
+    return sums - np.repeat(before, counts)